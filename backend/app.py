@@ -1,11 +1,13 @@
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import pyodbc
 import json
 from datetime import datetime
 import traceback
 
+from json_stream import dumps, stream_json, stream_rows
+
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:5173", "http://localhost:3000"])  # Allow frontend origins
 
@@ -47,19 +49,9 @@ def get_projects():
             )
         """)
         
+        conn.commit()
         cursor.execute("SELECT id, name, description, status, created_date FROM Projects")
-        projects = []
-        for row in cursor.fetchall():
-            projects.append({
-                'id': row[0],
-                'name': row[1],
-                'description': row[2],
-                'status': row[3],
-                'created_date': row[4].isoformat() if row[4] else None
-            })
-        
-        conn.close()
-        return jsonify(projects)
+        return stream_rows(cursor, conn)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -107,20 +99,9 @@ def get_testcases(project_id):
             )
         """)
         
+        conn.commit()
         cursor.execute("SELECT id, name, description, priority, status, created_date FROM TestCases WHERE project_id = ?", (project_id,))
-        testcases = []
-        for row in cursor.fetchall():
-            testcases.append({
-                'id': row[0],
-                'name': row[1],
-                'description': row[2],
-                'priority': row[3],
-                'status': row[4],
-                'created_date': row[5].isoformat() if row[5] else None
-            })
-        
-        conn.close()
-        return jsonify(testcases)
+        return stream_rows(cursor, conn)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -174,9 +155,9 @@ def create_testcase():
                 passed_steps INT,
                 failed_steps INT,
                 execution_time NVARCHAR(50),
-                test_data NVARCHAR(1000),
-                step_results NVARCHAR(2000),
-                error_message NVARCHAR(1000),
+                test_data NVARCHAR(MAX),
+                step_results NVARCHAR(MAX),
+                error_message NVARCHAR(MAX),
                 execution_date DATETIME DEFAULT GETDATE()
             )
         """)
@@ -199,22 +180,7 @@ def get_teststeps(testcase_name):
         
         table_name = testcase_name.replace(' ', '_').replace('-', '_')
         cursor.execute(f"SELECT id, tc_id, step_no, test_step_description, element_name, action_type, xpath, values FROM [{table_name}] ORDER BY step_no")
-        
-        steps = []
-        for row in cursor.fetchall():
-            steps.append({
-                'id': row[0],
-                'tc_id': row[1],
-                'step_no': row[2],
-                'test_step_description': row[3],
-                'element_name': row[4],
-                'action_type': row[5],
-                'xpath': row[6],
-                'values': row[7]
-            })
-        
-        conn.close()
-        return jsonify(steps)
+        return stream_rows(cursor, conn)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -252,10 +218,17 @@ def create_teststep(testcase_name):
 def execute_testcase(testcase_name):
     try:
         print(f"🚀 Starting test execution for: {testcase_name}")
+        from functools import partial
+        from retry_manager import RetryManager
         from test_executor import TestExecutor
         
-        executor = TestExecutor()
-        result = executor.execute_test_case(testcase_name)
+        data = request.get_json(silent=True) or {}
+        retry_manager = RetryManager(
+            get_db_connection,
+            executor_factory=partial(TestExecutor, browser_profile=data.get('browser_profile')),
+            max_retries=int(data.get('max_retries', 2))
+        )
+        result = retry_manager.run_test_case(testcase_name)
         
         print(f"✅ Test execution completed for: {testcase_name}")
         return jsonify(result)
@@ -264,6 +237,204 @@ def execute_testcase(testcase_name):
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/execute-suite', methods=['POST'])
+def execute_suite():
+    try:
+        data = request.json
+        from retry_manager import RetryManager
+        
+        retry_manager = RetryManager(get_db_connection, max_retries=int(data.get('max_retries', 2)))
+        result = retry_manager.run_suite(data['testcases'])
+        
+        print(f"✅ Suite execution completed: {result['status']}")
+        return jsonify(result)
+    except Exception as e:
+        print(f"❌ Suite execution failed: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Test Data API
+@app.route('/api/testdata/<testcase_name>', methods=['GET'])
+def get_testdata(testcase_name):
+    try:
+        from parameterized_runs import DataDrivenRunner, decode_data_row
+        
+        conn = get_db_connection()
+        cursor = DataDrivenRunner(get_db_connection).query_rows(conn, testcase_name, enabled_only=False)
+        return stream_rows(cursor, conn, transform=decode_data_row)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/testdata/<testcase_name>', methods=['POST'])
+def create_testdata(testcase_name):
+    try:
+        data = request.json
+        from parameterized_runs import DataDrivenRunner
+        
+        rows = data['rows'] if 'rows' in data else [data]
+        count = DataDrivenRunner(get_db_connection).add_rows(testcase_name, rows)
+        
+        print(f"✅ Saved {count} data row(s) for {testcase_name}")
+        return jsonify({'message': f'{count} data row(s) saved'})
+    except Exception as e:
+        print(f"❌ Error saving test data: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/execute-data/<testcase_name>', methods=['POST'])
+def execute_data_driven(testcase_name):
+    try:
+        data = request.get_json(silent=True) or {}
+        from functools import partial
+        from parameterized_runs import DataDrivenRunner
+        from test_executor import TestExecutor
+        
+        runner = DataDrivenRunner(
+            get_db_connection,
+            executor_factory=partial(TestExecutor, browser_profile=data.get('browser_profile')),
+            max_workers=int(data.get('max_workers', 4))
+        )
+        result = runner.run(testcase_name, row_ids=data.get('row_ids'))
+        
+        print(f"✅ Data-driven execution completed for: {testcase_name}")
+        return jsonify(result)
+    except Exception as e:
+        print(f"❌ Data-driven execution failed: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Suite Scheduling API
+@app.route('/api/schedule/<int:project_id>', methods=['POST'])
+def schedule_project(project_id):
+    try:
+        data = request.get_json(silent=True) or {}
+        from suite_scheduler import SuiteScheduler
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM TestCases WHERE project_id = ? AND status = 'Active'", (project_id,))
+        testcase_names = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        
+        scheduler = SuiteScheduler(get_db_connection)
+        schedule = scheduler.plan(
+            testcase_names,
+            workers=int(data.get('workers', 1)),
+            failures_first=bool(data.get('failures_first', False))
+        )
+        
+        mode = data.get('mode', 'plan')
+        if mode == 'local':
+            return jsonify(scheduler.run_local(schedule))
+        if mode == 'distributed':
+            schedule['job_ids'] = scheduler.enqueue(schedule, get_job_queue())
+        return jsonify(schedule)
+    except Exception as e:
+        print(f"❌ Suite scheduling failed: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+# Session Snapshots API
+def get_snapshot_manager():
+    from session_snapshots import SessionSnapshotManager
+    from test_executor import TestExecutor
+    
+    return SessionSnapshotManager(get_db_connection, TestExecutor().read_test_steps_from_db)
+
+@app.route('/api/snapshots', methods=['GET'])
+def get_snapshots():
+    try:
+        from session_snapshots import summarize_snapshot
+        
+        conn = get_db_connection()
+        cursor = get_snapshot_manager().query_snapshots(conn)
+        return stream_rows(cursor, conn, transform=summarize_snapshot)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/snapshots', methods=['POST'])
+def register_snapshot():
+    try:
+        data = request.json
+        get_snapshot_manager().register(data['name'], data['setup_testcase'], int(data.get('ttl_seconds', 3600)))
+        return jsonify({'message': f"Session snapshot '{data['name']}' registered"})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/snapshots/<snapshot_name>/invalidate', methods=['POST'])
+def invalidate_snapshot(snapshot_name):
+    try:
+        get_snapshot_manager().invalidate(snapshot_name)
+        return jsonify({'message': f"Session snapshot '{snapshot_name}' invalidated"})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Checkpoint / Resume API
+@app.route('/api/checkpoints', methods=['GET'])
+def get_checkpoints():
+    try:
+        from checkpoints import CheckpointStore
+        
+        conn = get_db_connection()
+        cursor = CheckpointStore(get_db_connection).query_checkpoints(conn, request.args.get('status'))
+        return stream_rows(cursor, conn)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/resume/<run_id>', methods=['POST'])
+def resume_run(run_id):
+    try:
+        data = request.get_json(silent=True) or {}
+        from test_executor import TestExecutor
+        
+        result = TestExecutor(browser_profile=data.get('browser_profile')).resume_test_case(run_id)
+        return jsonify(result)
+    except Exception as e:
+        print(f"❌ Resume failed: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/resume-suite/<suite_run_id>', methods=['POST'])
+def resume_suite(suite_run_id):
+    try:
+        data = request.get_json(silent=True) or {}
+        from retry_manager import RetryManager
+        
+        retry_manager = RetryManager(get_db_connection, max_retries=int(data.get('max_retries', 2)))
+        result = retry_manager.resume_suite(suite_run_id)
+        
+        print(f"✅ Suite resume completed: {result['status']}")
+        return jsonify(result)
+    except Exception as e:
+        print(f"❌ Suite resume failed: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Flakiness API
+@app.route('/api/flakiness', methods=['GET'])
+def get_flakiness():
+    try:
+        from retry_manager import RetryManager
+        
+        retry_manager = RetryManager(get_db_connection)
+        retry_manager.ensure_tables()
+        conn = get_db_connection()
+        return stream_rows(retry_manager.query_flakiness(conn), conn)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/flakiness/<testcase_name>/quarantine', methods=['POST'])
+def set_quarantine(testcase_name):
+    try:
+        data = request.get_json(silent=True) or {}
+        from retry_manager import RetryManager
+        
+        quarantined = bool(data.get('quarantined', True))
+        RetryManager(get_db_connection).set_quarantine(testcase_name, quarantined)
+        
+        state = 'quarantined' if quarantined else 'released from quarantine'
+        return jsonify({'message': f'Test case {testcase_name} {state}'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ... keep existing code (Results API)
 
 @app.route('/api/results/<testcase_name>', methods=['GET'])
@@ -280,27 +451,138 @@ def get_results(testcase_name):
             FROM [{results_table_name}] 
             ORDER BY execution_date DESC
         """)
+        return stream_rows(cursor, conn)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Distributed Jobs API
+def get_job_queue():
+    from job_queue import JobQueue
+    
+    job_queue = JobQueue(get_db_connection, 'mssql')
+    job_queue.ensure_table()
+    return job_queue
+
+@app.route('/api/jobs', methods=['POST'])
+def enqueue_jobs():
+    try:
+        data = request.json
+        job_queue = get_job_queue()
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'result_id': row[0],
-                'testcase_name': row[1],
-                'tc_id': row[2],
-                'test_mode': row[3],
-                'status': row[4],
-                'total_steps': row[5],
-                'passed_steps': row[6],
-                'failed_steps': row[7],
-                'execution_time': row[8],
-                'test_data': row[9],
-                'step_results': row[10],
-                'error_message': row[11],
-                'execution_date': row[12].isoformat() if row[12] else None
-            })
+        job_ids = [
+            job_queue.enqueue(name, priority=int(data.get('priority', 0)), max_attempts=int(data.get('max_attempts', 3)))
+            for name in data['testcases']
+        ]
         
-        conn.close()
-        return jsonify(results)
+        print(f"📥 Queued {len(job_ids)} job(s) for worker execution")
+        return jsonify({'job_ids': job_ids, 'message': f'{len(job_ids)} job(s) queued'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    try:
+        from job_queue import decode_job
+        
+        job_queue = get_job_queue()
+        counts = job_queue.counts()
+        conn = get_db_connection()
+        cursor = job_queue.query_jobs(conn, request.args.get('status'))
+        return stream_rows(cursor, conn, transform=decode_job, key='jobs', extra={'counts': counts})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        job = get_job_queue().get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return Response(dumps(job), mimetype='application/json')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Artifacts API
+@app.route('/api/artifacts/<testcase_name>', methods=['GET'])
+def get_artifacts(testcase_name):
+    try:
+        from artifact_store import ensure_artifact_table
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Create TestArtifacts table if not exists
+        ensure_artifact_table(cursor)
+        conn.commit()
+        
+        query = """
+            SELECT artifact_id, run_id, result_id, step_no, kind, digest, original_size, stored_size, created_date,
+                   '/api/artifacts/blob/' + kind + '/' + digest AS url
+            FROM TestArtifacts WHERE testcase_name = ?
+        """
+        params = [testcase_name]
+        if request.args.get('result_id'):
+            query += " AND result_id = ?"
+            params.append(int(request.args['result_id']))
+        if request.args.get('run_id'):
+            query += " AND run_id = ?"
+            params.append(request.args['run_id'])
+        cursor.execute(query + " ORDER BY created_date DESC", params)
+        return stream_rows(cursor, conn)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/artifacts/blob/<kind>/<digest>', methods=['GET'])
+def get_artifact_blob(kind, digest):
+    try:
+        from artifact_store import ArtifactStore, ARTIFACT_KINDS
+        
+        if kind not in ARTIFACT_KINDS or not digest.isalnum():
+            return jsonify({'error': 'Invalid artifact'}), 400
+        
+        content = ArtifactStore().get(digest)
+        if content is None:
+            return jsonify({'error': 'Artifact not found or evicted'}), 404
+        
+        return Response(content, mimetype=ARTIFACT_KINDS[kind]['mimetype'])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Result Retention API
+@app.route('/api/retention/run', methods=['POST'])
+def run_retention():
+    try:
+        data = request.get_json(silent=True) or {}
+        from result_retention import ResultRetention
+        
+        summary = ResultRetention(get_db_connection, hot_days=int(data.get('hot_days', 30))).run()
+        return jsonify(summary)
+    except Exception as e:
+        print(f"❌ Retention job failed: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/rollups/<testcase_name>', methods=['GET'])
+def get_rollups(testcase_name):
+    try:
+        from result_retention import ResultRetention
+        
+        conn = get_db_connection()
+        cursor = ResultRetention(get_db_connection).query_rollups(conn, testcase_name)
+        return stream_rows(cursor, conn)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/archive/<testcase_name>', methods=['GET'])
+def get_archive(testcase_name):
+    try:
+        from result_retention import MONTH_PATTERN, ResultRetention
+        
+        months = request.args.getlist('month') or None
+        invalid = [month for month in months or [] if not MONTH_PATTERN.fullmatch(month)]
+        if invalid:
+            return jsonify({'error': f"Invalid month(s) {', '.join(invalid)}, expected YYYY-MM"}), 400
+        return stream_json(ResultRetention(get_db_connection).iter_archive(testcase_name, months))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
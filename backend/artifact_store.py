@@ -0,0 +1,261 @@
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+ARTIFACT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts')
+
+# Already-compressed formats are stored as-is
+ARTIFACT_KINDS = {
+    'screenshot': {'mimetype': 'image/png', 'compress': False},
+    'dom': {'mimetype': 'text/html', 'compress': True},
+    'console': {'mimetype': 'application/json', 'compress': True},
+}
+
+
+def ensure_artifact_table(cursor):
+    """Create the artifact index table if not exists"""
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='TestArtifacts' AND xtype='U')
+        CREATE TABLE TestArtifacts (
+            artifact_id INT IDENTITY(1,1) PRIMARY KEY,
+            run_id NVARCHAR(64),
+            result_id INT,
+            testcase_name NVARCHAR(255),
+            step_no INT,
+            kind NVARCHAR(20),
+            digest NVARCHAR(64),
+            original_size INT,
+            stored_size INT,
+            created_date DATETIME DEFAULT GETDATE()
+        )
+    """)
+
+
+class ArtifactStore:
+    """Content-addressed local artifact store with dedup and size-based eviction"""
+
+    def __init__(self, root=ARTIFACT_ROOT, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # Running total so writes only rescan the store once it is over the cap
+        self.current_bytes = None
+        # Digests removed by eviction whose index rows have not been dropped yet
+        self.evicted_digests = []
+        os.makedirs(self.root, exist_ok=True)
+
+    def _object_path(self, digest, compressed):
+        suffix = '.gz' if compressed else ''
+        return os.path.join(self.root, digest[:2], f"{digest}{suffix}")
+
+    def find(self, digest):
+        """Return (path, compressed) for a stored digest or None"""
+        for compressed in (True, False):
+            path = self._object_path(digest, compressed)
+            if os.path.exists(path):
+                return path, compressed
+        return None
+
+    def put(self, content, compress=True):
+        """Store content and return (digest, stored_size, deduplicated)"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+
+        digest = hashlib.sha256(content).hexdigest()
+        with self.lock:
+            existing = self.find(digest)
+            if existing:
+                os.utime(existing[0])
+                return digest, os.path.getsize(existing[0]), True
+
+            path = self._object_path(digest, compress)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = gzip.compress(content, compresslevel=6) if compress else content
+
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            if self.current_bytes is None:
+                self.current_bytes = self.total_size()
+            else:
+                self.current_bytes += len(data)
+            if self.current_bytes > self.max_bytes:
+                self.evict()
+            return digest, len(data), False
+
+    def get(self, digest):
+        """Read and decompress stored content, or None if missing or evicted"""
+        found = self.find(digest)
+        if not found:
+            return None
+
+        path, compressed = found
+        os.utime(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        return gzip.decompress(data) if compressed else data
+
+    def total_size(self):
+        return sum(size for _, size, _ in self._objects())
+
+    def take_evicted(self):
+        """Return and clear the digests evicted since the last call"""
+        with self.lock:
+            evicted, self.evicted_digests = self.evicted_digests, []
+        return evicted
+
+    def _objects(self):
+        objects = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                objects.append((path, stat.st_size, stat.st_mtime))
+        return objects
+
+    def evict(self):
+        """Remove least recently used objects until the store is back under 90% of max_bytes"""
+        objects = sorted(self._objects(), key=lambda obj: obj[2])
+        total = sum(size for _, size, _ in objects)
+        target = self.max_bytes * 0.9
+        evicted = 0
+
+        for path, size, _ in objects:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+            self.evicted_digests.append(os.path.basename(path).split('.')[0])
+
+        self.current_bytes = total
+
+        if evicted:
+            print(f"🧹 Evicted {evicted} artifact(s) from store")
+        return evicted
+
+
+class ArtifactCapture:
+    """Background writer that compresses, stores and indexes failure artifacts"""
+
+    def __init__(self, connection_factory, store=None):
+        self.connection_factory = connection_factory
+        self.store = store or ArtifactStore()
+        self.jobs = queue.Queue()
+        self.table_ready = False
+        self.thread = threading.Thread(target=self._worker, name='artifact-capture', daemon=True)
+        self.thread.start()
+
+    def capture_failure(self, driver, run_id, testcase_name, step_no):
+        """Grab raw artifacts from the browser and hand them to the background thread"""
+        if not driver:
+            return
+
+        artifacts = {}
+        try:
+            artifacts['screenshot'] = driver.get_screenshot_as_png()
+        except Exception as e:
+            print(f"Could not capture screenshot: {str(e)}")
+        try:
+            artifacts['dom'] = driver.page_source
+        except Exception as e:
+            print(f"Could not capture DOM snapshot: {str(e)}")
+        try:
+            artifacts['console'] = json.dumps(driver.get_log('browser'))
+        except Exception as e:
+            print(f"Could not capture console log: {str(e)}")
+
+        for kind, content in artifacts.items():
+            self.jobs.put(('store', run_id, testcase_name, step_no, kind, content))
+
+    def link_result(self, run_id, result_id):
+        """Attach a run's artifacts to its results row once the row exists"""
+        self.jobs.put(('link', run_id, result_id))
+
+    def flush(self, timeout=None):
+        """Block until all queued artifacts have been written"""
+        deadline = time.time() + timeout if timeout else None
+        while self.jobs.unfinished_tasks:
+            if deadline and time.time() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _worker(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job[0] == 'store':
+                    self._store(*job[1:])
+                elif job[0] == 'link':
+                    self._link(*job[1:])
+            except Exception as e:
+                print(f"✗ Error writing artifact: {str(e)}")
+            finally:
+                self.jobs.task_done()
+
+    def _store(self, run_id, testcase_name, step_no, kind, content):
+        raw = content.encode('utf-8') if isinstance(content, str) else content
+        digest, stored_size, deduplicated = self.store.put(raw, compress=ARTIFACT_KINDS[kind]['compress'])
+
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        if not self.table_ready:
+            ensure_artifact_table(cursor)
+            self.table_ready = True
+
+        # Index rows of evicted blobs would list URLs that 404
+        evicted = self.store.take_evicted()
+        if evicted:
+            cursor.executemany("DELETE FROM TestArtifacts WHERE digest = ?", [(d,) for d in evicted])
+
+        cursor.execute("""
+            INSERT INTO TestArtifacts (run_id, testcase_name, step_no, kind, digest, original_size, stored_size)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (run_id, testcase_name, step_no, kind, digest, len(raw), stored_size))
+        conn.commit()
+        conn.close()
+
+        note = ' (deduplicated)' if deduplicated else ''
+        print(f"📎 Stored {kind} for step {step_no}: {len(raw)} -> {stored_size} bytes{note}")
+
+    def _link(self, run_id, result_id):
+        # Unconditional: a resumed run may have stored its artifacts in another process
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        if not self.table_ready:
+            ensure_artifact_table(cursor)
+            self.table_ready = True
+        cursor.execute("UPDATE TestArtifacts SET result_id = ? WHERE run_id = ?", (result_id, run_id))
+        conn.commit()
+        conn.close()
+
+
+_capture = None
+_capture_lock = threading.Lock()
+
+
+def get_artifact_capture(connection_factory):
+    """Get the process-wide artifact capture worker"""
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = ArtifactCapture(connection_factory)
+        return _capture
+
+
+def flush_artifacts(timeout=None):
+    """Wait for queued artifacts to be written, e.g. before a worker exits"""
+    if _capture is not None:
+        _capture.flush(timeout)
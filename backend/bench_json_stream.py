@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: row-to-JSON for GET endpoints, before and after streaming.
+
+"before" mirrors the original handlers: fetchall(), index-by-index dicts,
+isoformat() per row, then one json.dumps of the whole list (what jsonify does).
+"after" is json_stream.iter_rows + iter_json_array: fetchmany() batches,
+column names from cursor.description, incremental encoding (orjson when
+installed).
+
+Uses an in-memory SQLite results table so it runs without SQL Server:
+    python bench_json_stream.py --rows 50000
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from json_stream import iter_json_array, iter_rows, orjson
+
+RESULT_COLUMNS = ('result_id, testcase_name, tc_id, test_mode, status, total_steps, passed_steps, failed_steps, '
+                  'execution_time, test_data, step_results, error_message, execution_date')
+
+
+def build_database(rows):
+    conn = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.execute("""
+        CREATE TABLE Results (
+            result_id INTEGER PRIMARY KEY, testcase_name TEXT, tc_id TEXT, test_mode TEXT, status TEXT,
+            total_steps INTEGER, passed_steps INTEGER, failed_steps INTEGER, execution_time TEXT,
+            test_data TEXT, step_results TEXT, error_message TEXT, execution_date TIMESTAMP
+        )
+    """)
+    start = datetime(2026, 1, 1)
+    step_results = ','.join(f"{i}:PASS" for i in range(1, 41))
+    conn.executemany(
+        f"INSERT INTO Results ({RESULT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((i, 'Flight_Search', 'TC_001', 'Automated', 'PASS' if i % 7 else 'FAIL', 40, 40 - (i % 7 == 0), i % 7 == 0,
+          str(timedelta(seconds=60 + i % 90)), 'Automated Test Data', step_results,
+          '' if i % 7 else 'Step 12: Element not found', start + timedelta(minutes=i))
+         for i in range(1, rows + 1))
+    )
+    conn.commit()
+    return conn
+
+
+def before(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {RESULT_COLUMNS} FROM Results ORDER BY execution_date DESC")
+    results = []
+    for row in cursor.fetchall():
+        results.append({
+            'result_id': row[0],
+            'testcase_name': row[1],
+            'tc_id': row[2],
+            'test_mode': row[3],
+            'status': row[4],
+            'total_steps': row[5],
+            'passed_steps': row[6],
+            'failed_steps': row[7],
+            'execution_time': row[8],
+            'test_data': row[9],
+            'step_results': row[10],
+            'error_message': row[11],
+            'execution_date': row[12].isoformat() if row[12] else None
+        })
+    body = json.dumps(results).encode('utf-8')
+    return len(body)
+
+
+def after(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {RESULT_COLUMNS} FROM Results ORDER BY execution_date DESC")
+    # Consume chunks the way the WSGI server would write them to the socket
+    return sum(len(chunk) for chunk in iter_json_array(iter_rows(cursor)))
+
+
+def measure(fn, conn, repeat):
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = fn(conn)
+        timings.append(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return min(timings), peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    conn = build_database(args.rows)
+    print(f"Rows: {args.rows}, encoder: {'orjson' if orjson else 'json'} (tracemalloc adds overhead to both)")
+    for name, fn in (('before', before), ('after', after)):
+        seconds, peak, size = measure(fn, conn, args.repeat)
+        print(f"{name:>6}: {seconds * 1000:8.1f} ms  peak {peak / (1024 * 1024):7.2f} MB  body {size / 1024:9.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
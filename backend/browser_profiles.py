@@ -0,0 +1,277 @@
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 'default' keeps the original headed, maximized browser. The lean profiles trade
+# visual fidelity for density so more sessions fit on one worker node.
+BROWSER_PROFILES = {
+    'default': {
+        'headless': False,
+        'window_size': None,
+        'disable_images': False,
+        'disable_fonts': False,
+        'disable_extensions': False,
+        'disable_background_throttling': False,
+        'max_memory_mb': None,
+        'cpu_cores': None,
+        'nice': None,
+        'network_control': False
+    },
+    'lean': {
+        'headless': True,
+        'window_size': (1366, 768),
+        'disable_images': True,
+        'disable_fonts': True,
+        'disable_extensions': True,
+        'disable_background_throttling': True,
+        'max_memory_mb': 768,
+        'cpu_cores': 1,
+        'nice': 10,
+        'network_control': True
+    },
+    'headless': {
+        'headless': True,
+        'window_size': (1920, 1080),
+        'disable_images': False,
+        'disable_fonts': False,
+        'disable_extensions': True,
+        'disable_background_throttling': True,
+        'max_memory_mb': 1536,
+        'cpu_cores': 2,
+        'nice': None,
+        'network_control': True
+    }
+}
+
+# Claim files are shared by every worker process on the node: one per pinned core,
+# so concurrent sessions are pinned to different cores instead of all to the first ones
+CORE_CLAIM_DIR = os.environ.get('TEST_CORE_CLAIM_DIR', os.path.join(tempfile.gettempdir(), 'test-pilot-cores'))
+
+
+def _pid_alive(pid):
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if os.name == 'posix':
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+    return True
+
+
+def _claim_owner_alive(path):
+    try:
+        with open(path) as f:
+            owner = f.read().strip()
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+    # An empty file is a claim still being written
+    return not owner.isdigit() or _pid_alive(int(owner))
+
+
+def claim_file(path):
+    """Claim a node-wide slot for this process; stale claims of dead processes are taken over.
+
+    Returns the claim path, or None if a live process holds it.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if _claim_owner_alive(path):
+                return None
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(os.getpid()))
+        return path
+    return None
+
+
+def release_claims(claims):
+    for path in claims:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def claim_cores(cores, size):
+    """Claim the first free slice of `size` cores node-wide.
+
+    Returns (slice, claim_paths). When every slice is taken the session shares
+    one picked by pid, unclaimed.
+    """
+    for start in range(0, len(cores) - size + 1, size):
+        claims = []
+        for core in cores[start:start + size]:
+            path = claim_file(os.path.join(CORE_CLAIM_DIR, f"core-{core}"))
+            if path is None:
+                break
+            claims.append(path)
+        if len(claims) == size:
+            return cores[start:start + size], claims
+        release_claims(claims)
+
+    start = (os.getpid() % (len(cores) // size)) * size
+    return cores[start:start + size], []
+
+
+def get_browser_profile(name=None):
+    """Resolve a profile by name, falling back to TEST_BROWSER_PROFILE or 'default'"""
+    name = name or os.environ.get('TEST_BROWSER_PROFILE', 'default')
+    if name not in BROWSER_PROFILES:
+        raise ValueError(f"Unknown browser profile: {name}")
+    return dict(BROWSER_PROFILES[name], name=name)
+
+
+def apply_profile_options(chrome_options, profile):
+    """Add profile-specific Chrome arguments and preferences"""
+    if profile['headless']:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--disable-gpu")
+    if profile['window_size']:
+        chrome_options.add_argument(f"--window-size={profile['window_size'][0]},{profile['window_size'][1]}")
+    if profile['disable_extensions']:
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-component-extensions-with-background-pages")
+    if profile['disable_fonts']:
+        chrome_options.add_argument("--disable-remote-fonts")
+    if profile['disable_background_throttling']:
+        chrome_options.add_argument("--disable-background-timer-throttling")
+        chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+        chrome_options.add_argument("--disable-renderer-backgrounding")
+    if profile['max_memory_mb']:
+        chrome_options.add_argument(f"--js-flags=--max-old-space-size={profile['max_memory_mb'] // 2}")
+        chrome_options.add_argument("--renderer-process-limit=2")
+
+    if profile['disable_images']:
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2
+        })
+
+
+class SessionMonitor:
+    """Sample RSS and CPU of a browser session's process tree and apply CPU caps"""
+
+    def __init__(self, root_pid, profile, interval=1.0):
+        self.root_pid = root_pid
+        self.profile = profile
+        self.interval = interval
+        self.samples = 0
+        self.peak_rss_mb = 0.0
+        self.cpu_percent_total = 0.0
+        self.cpu_seconds = 0.0
+        self.over_memory_budget = False
+        self.capped_pids = set()
+        self.core_slice = None
+        self.core_claims = []
+        # Process objects are kept across samples: cpu_percent() measures since the
+        # previous call on the same object, so fresh objects would always read 0
+        self.processes = {}
+        self.stopped = threading.Event()
+        self.thread = None
+        self.start_time = None
+
+    def start(self):
+        if psutil is None:
+            print("⚠️ psutil not installed; session resource monitoring disabled")
+            return self
+        self.start_time = time.time()
+        self.thread = threading.Thread(target=self._run, name='session-monitor', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the collected usage summary"""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval * 2)
+        release_claims(self.core_claims)
+        self.core_claims = []
+        return self.summary()
+
+    def summary(self):
+        return {
+            'profile': self.profile['name'],
+            'samples': self.samples,
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'avg_cpu_percent': round(self.cpu_percent_total / self.samples, 1) if self.samples else 0.0,
+            'cpu_seconds': round(self.cpu_seconds, 2),
+            'max_memory_mb': self.profile['max_memory_mb'],
+            'over_memory_budget': self.over_memory_budget
+        }
+
+    def _processes(self):
+        try:
+            root = self.processes.get(self.root_pid) or psutil.Process(self.root_pid)
+            current = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+        live = {}
+        for process in current:
+            live[process.pid] = self.processes.get(process.pid, process)
+        self.processes = live
+        return list(live.values())
+
+    def _core_slice(self, process):
+        """Pick this session's cores once, from the slices not claimed on this node"""
+        if self.core_slice is None:
+            cores = process.cpu_affinity()
+            size = min(self.profile['cpu_cores'], len(cores))
+            self.core_slice, self.core_claims = claim_cores(cores, size)
+        return self.core_slice
+
+    def _apply_caps(self, process):
+        if process.pid in self.capped_pids:
+            return
+        self.capped_pids.add(process.pid)
+        try:
+            if self.profile['cpu_cores'] and hasattr(process, 'cpu_affinity'):
+                process.cpu_affinity(self._core_slice(process))
+            if self.profile['nice'] is not None and os.name == 'posix':
+                process.nice(self.profile['nice'])
+        except psutil.Error:
+            pass
+
+    def _run(self):
+        cpu_totals = {}
+        while not self.stopped.is_set():
+            rss = 0
+            cpu_percent = 0.0
+            for process in self._processes():
+                try:
+                    self._apply_caps(process)
+                    rss += process.memory_info().rss
+                    cpu_percent += process.cpu_percent(interval=None)
+                    times = process.cpu_times()
+                    cpu_totals[process.pid] = times.user + times.system
+                except psutil.Error:
+                    continue
+
+            rss_mb = rss / (1024 * 1024)
+            self.samples += 1
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+            self.cpu_percent_total += cpu_percent
+            self.cpu_seconds = sum(cpu_totals.values())
+
+            if self.profile['max_memory_mb'] and rss_mb > self.profile['max_memory_mb'] and not self.over_memory_budget:
+                self.over_memory_budget = True
+                print(f"⚠️ Browser session exceeded memory budget: {rss_mb:.0f}MB > {self.profile['max_memory_mb']}MB")
+
+            self.stopped.wait(self.interval)
@@ -0,0 +1,136 @@
+import json
+from datetime import datetime
+
+from json_stream import iter_rows
+
+
+def decode_checkpoint(checkpoint):
+    """Parse the stored JSON and step list columns of a checkpoint row dict"""
+    checkpoint['parameters'] = json.loads(checkpoint['parameters']) if checkpoint['parameters'] else None
+    checkpoint['step_results'] = checkpoint['step_results'].split(',') if checkpoint['step_results'] else []
+    checkpoint['error_message'] = checkpoint['error_message'] or ''
+    checkpoint['elapsed_seconds'] = checkpoint['elapsed_seconds'] or 0.0
+    checkpoint['session_state'] = json.loads(checkpoint['session_state']) if checkpoint['session_state'] else None
+    return checkpoint
+
+
+class CheckpointStore:
+    """Persist in-flight run progress so an interrupted run can be resumed"""
+
+    def __init__(self, connection_factory):
+        self.connection_factory = connection_factory
+        self.table_ready = False
+
+    def ensure_table(self, cursor):
+        if self.table_ready:
+            return
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='TestCheckpoints' AND xtype='U')
+            CREATE TABLE TestCheckpoints (
+                run_id NVARCHAR(64) PRIMARY KEY,
+                suite_run_id NVARCHAR(64),
+                testcase_name NVARCHAR(255),
+                test_mode NVARCHAR(50),
+                parameters NVARCHAR(MAX),
+                next_index INT,
+                passed_steps INT,
+                failed_steps INT,
+                step_results NVARCHAR(MAX),
+                error_message NVARCHAR(MAX),
+                elapsed_seconds FLOAT,
+                session_state NVARCHAR(MAX),
+                status NVARCHAR(20) DEFAULT 'running',
+                updated_date DATETIME
+            )
+        """)
+        self.table_ready = True
+
+    def save(self, checkpoint):
+        """Insert or overwrite the checkpoint for a run"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        self.ensure_table(cursor)
+
+        cursor.execute("DELETE FROM TestCheckpoints WHERE run_id = ?", (checkpoint['run_id'],))
+        cursor.execute("""
+            INSERT INTO TestCheckpoints
+            (run_id, suite_run_id, testcase_name, test_mode, parameters, next_index, passed_steps, failed_steps,
+             step_results, error_message, elapsed_seconds, session_state, status, updated_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'running', ?)
+        """, (
+            checkpoint['run_id'],
+            checkpoint['suite_run_id'],
+            checkpoint['testcase_name'],
+            checkpoint['test_mode'],
+            json.dumps(checkpoint['parameters']) if checkpoint['parameters'] else None,
+            checkpoint['next_index'],
+            checkpoint['passed_steps'],
+            checkpoint['failed_steps'],
+            ','.join(checkpoint['step_results']),
+            checkpoint['error_message'],
+            checkpoint['elapsed_seconds'],
+            json.dumps(checkpoint['session_state']) if checkpoint['session_state'] else None,
+            datetime.now()
+        ))
+
+        conn.commit()
+        conn.close()
+
+    def mark(self, run_id, status):
+        """Mark a checkpoint completed (or resumed into a new run)"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        self.ensure_table(cursor)
+        cursor.execute("UPDATE TestCheckpoints SET status = ?, updated_date = ? WHERE run_id = ?",
+                       (status, datetime.now(), run_id))
+        conn.commit()
+        conn.close()
+
+    def load(self, run_id):
+        checkpoints = self._query("WHERE run_id = ?", (run_id,))
+        return checkpoints[0] if checkpoints else None
+
+    def find_running(self, suite_run_id, testcase_name):
+        """Latest unfinished checkpoint of a test case within a suite run"""
+        checkpoints = self._query("WHERE suite_run_id = ? AND testcase_name = ? AND status = 'running'",
+                                  (suite_run_id, testcase_name))
+        return checkpoints[0] if checkpoints else None
+
+    def list_checkpoints(self, status=None):
+        conn = self.connection_factory()
+        checkpoints = list(iter_rows(self.query_checkpoints(conn, status)))
+        conn.close()
+        return checkpoints
+
+    def query_checkpoints(self, conn, status=None):
+        """Execute a progress listing (without the large session state) and return the cursor"""
+        cursor = conn.cursor()
+        self.ensure_table(cursor)
+        conn.commit()
+
+        query = """
+            SELECT run_id, suite_run_id, testcase_name, next_index, passed_steps, failed_steps, status, updated_date
+            FROM TestCheckpoints
+        """
+        if status:
+            cursor.execute(query + " WHERE status = ? ORDER BY updated_date DESC", (status,))
+        else:
+            cursor.execute(query + " ORDER BY updated_date DESC")
+        return cursor
+
+    def _query(self, where, params):
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        self.ensure_table(cursor)
+        conn.commit()
+
+        cursor.execute(f"""
+            SELECT run_id, suite_run_id, testcase_name, test_mode, parameters, next_index, passed_steps,
+                   failed_steps, step_results, error_message, elapsed_seconds, session_state, status, updated_date
+            FROM TestCheckpoints {where}
+            ORDER BY updated_date DESC
+        """, params)
+
+        checkpoints = list(iter_rows(cursor, transform=decode_checkpoint))
+        conn.close()
+        return checkpoints
@@ -0,0 +1,214 @@
+import json
+
+from json_stream import iter_rows
+
+# DDL and clock expressions differ per backend; every other statement is shared
+# between SQL Server and SQLite. All lease times come from the database clock,
+# so workers on machines with skewed clocks still agree on who holds a lease.
+JOB_TABLE_DDL = {
+    'mssql': """
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='TestJobs' AND xtype='U')
+        CREATE TABLE TestJobs (
+            job_id INT IDENTITY(1,1) PRIMARY KEY,
+            testcase_name NVARCHAR(255) NOT NULL,
+            status NVARCHAR(20) DEFAULT 'queued',
+            priority INT DEFAULT 0,
+            worker_id NVARCHAR(100),
+            lease_expires DATETIME2,
+            attempts INT DEFAULT 0,
+            max_attempts INT DEFAULT 3,
+            result NVARCHAR(MAX),
+            enqueued_at DATETIME2,
+            started_at DATETIME2,
+            finished_at DATETIME2
+        )
+    """,
+    'sqlite': """
+        CREATE TABLE IF NOT EXISTS TestJobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            testcase_name TEXT NOT NULL,
+            status TEXT DEFAULT 'queued',
+            priority INTEGER DEFAULT 0,
+            worker_id TEXT,
+            lease_expires TEXT,
+            attempts INTEGER DEFAULT 0,
+            max_attempts INTEGER DEFAULT 3,
+            result TEXT,
+            enqueued_at TEXT,
+            started_at TEXT,
+            finished_at TEXT
+        )
+    """
+}
+
+SQL_NOW = {
+    'mssql': "SYSUTCDATETIME()",
+    'sqlite': "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+}
+
+# Takes one parameter: the lease length (milliseconds on SQL Server, seconds on SQLite)
+SQL_LEASE_UNTIL = {
+    'mssql': "DATEADD(millisecond, ?, SYSUTCDATETIME())",
+    'sqlite': "strftime('%Y-%m-%d %H:%M:%f', 'now', '+' || ? || ' seconds')"
+}
+
+JOB_COLUMNS = ['job_id', 'testcase_name', 'status', 'priority', 'worker_id', 'lease_expires',
+               'attempts', 'max_attempts', 'result', 'enqueued_at', 'started_at', 'finished_at']
+
+LEASABLE = "(status = 'queued' OR (status = 'leased' AND lease_expires < {now}))"
+
+
+def decode_job(job):
+    """Parse the stored result JSON of a job row dict"""
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+
+class JobQueue:
+    """Shared job table with atomic leases, heartbeats and expiry"""
+
+    def __init__(self, connection_factory, dialect='mssql', lease_seconds=120):
+        if dialect not in JOB_TABLE_DDL:
+            raise ValueError(f"Unsupported dialect: {dialect}")
+        self.connection_factory = connection_factory
+        self.dialect = dialect
+        self.lease_seconds = lease_seconds
+        self.now = SQL_NOW[dialect]
+        self.lease_until = SQL_LEASE_UNTIL[dialect]
+        self.leasable = LEASABLE.format(now=self.now)
+
+    def _lease_length(self):
+        if self.dialect == 'mssql':
+            return int(self.lease_seconds * 1000)
+        return float(self.lease_seconds)
+
+    def ensure_table(self):
+        """Create job table if not exists"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute(JOB_TABLE_DDL[self.dialect])
+        conn.commit()
+        conn.close()
+
+    def enqueue(self, testcase_name, priority=0, max_attempts=3):
+        """Add a test case run to the queue and return its job id"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            INSERT INTO TestJobs (testcase_name, status, priority, attempts, max_attempts, enqueued_at)
+            VALUES (?, 'queued', ?, 0, ?, {self.now})
+        """, (testcase_name, priority, max_attempts))
+
+        if self.dialect == 'mssql':
+            job_id = cursor.execute("SELECT @@IDENTITY").fetchone()[0]
+        else:
+            job_id = cursor.lastrowid
+
+        conn.commit()
+        conn.close()
+        return int(job_id)
+
+    def lease(self, worker_id):
+        """Atomically claim the next queued or expired job, or return None.
+
+        Claiming is a compare-and-set UPDATE guarded by the leasable condition,
+        so two workers racing for the same row cannot both win.
+        """
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+
+        # Jobs whose lease expired too many times are given up on
+        cursor.execute(f"""
+            UPDATE TestJobs
+            SET status = 'failed', finished_at = {self.now}, result = ?
+            WHERE status = 'leased' AND lease_expires < {self.now} AND attempts >= max_attempts
+        """, (json.dumps({'success': False, 'error': 'Lease expired on every attempt'}),))
+        conn.commit()
+
+        top, limit = ("TOP 10", "") if self.dialect == 'mssql' else ("", "LIMIT 10")
+        cursor.execute(f"""
+            SELECT {top} job_id FROM TestJobs
+            WHERE {self.leasable}
+            ORDER BY priority DESC, job_id {limit}
+        """)
+        candidates = [row[0] for row in cursor.fetchall()]
+
+        for job_id in candidates:
+            cursor.execute(f"""
+                UPDATE TestJobs
+                SET status = 'leased', worker_id = ?, lease_expires = {self.lease_until},
+                    attempts = attempts + 1, started_at = {self.now}
+                WHERE job_id = ? AND {self.leasable}
+            """, (worker_id, self._lease_length(), job_id))
+            claimed = cursor.rowcount == 1
+            conn.commit()
+
+            if claimed:
+                job = self._get(cursor, job_id)
+                conn.close()
+                return job
+
+        conn.close()
+        return None
+
+    def heartbeat(self, job_id, worker_id):
+        """Extend a held lease; returns False if the lease was lost"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            UPDATE TestJobs SET lease_expires = {self.lease_until}
+            WHERE job_id = ? AND worker_id = ? AND status = 'leased'
+        """, (self._lease_length(), job_id, worker_id))
+        held = cursor.rowcount == 1
+        conn.commit()
+        conn.close()
+        return held
+
+    def complete(self, job_id, worker_id, result):
+        """Record a job result; ignored if another worker reclaimed the job"""
+        status = 'completed' if result.get('success') else 'failed'
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            UPDATE TestJobs SET status = ?, result = ?, finished_at = {self.now}
+            WHERE job_id = ? AND worker_id = ? AND status = 'leased'
+        """, (status, json.dumps(result, default=str), job_id, worker_id))
+        recorded = cursor.rowcount == 1
+        conn.commit()
+        conn.close()
+        return recorded
+
+    def get_job(self, job_id):
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        job = self._get(cursor, job_id)
+        conn.close()
+        return job
+
+    def list_jobs(self, status=None):
+        conn = self.connection_factory()
+        jobs = list(iter_rows(self.query_jobs(conn, status), transform=decode_job))
+        conn.close()
+        return jobs
+
+    def query_jobs(self, conn, status=None):
+        """Execute the job listing and return the cursor, leaving the rows to the caller"""
+        cursor = conn.cursor()
+        query = f"SELECT {', '.join(JOB_COLUMNS)} FROM TestJobs"
+        if status:
+            cursor.execute(query + " WHERE status = ? ORDER BY job_id", (status,))
+        else:
+            cursor.execute(query + " ORDER BY job_id")
+        return cursor
+
+    def counts(self):
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM TestJobs GROUP BY status")
+        counts = {row[0]: row[1] for row in cursor.fetchall()}
+        conn.close()
+        return counts
+
+    def _get(self, cursor, job_id):
+        cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM TestJobs WHERE job_id = ?", (job_id,))
+        return next(iter_rows(cursor, 1, decode_job), None)
@@ -0,0 +1,89 @@
+import itertools
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    """Encode to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def iter_rows(cursor, batch_size=500, transform=None):
+    """Yield row dicts, mapping column names from cursor.description once"""
+    columns = [column[0] for column in cursor.description]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            item = dict(zip(columns, row))
+            yield transform(item) if transform else item
+
+
+def iter_json_array(rows, batch_size=500):
+    """Encode row dicts as a JSON array, one batch-sized chunk at a time"""
+    yield b'['
+    batch = []
+    first = True
+    for row in rows:
+        batch.append(dumps(row))
+        if len(batch) == batch_size:
+            yield (b'' if first else b',') + b','.join(batch)
+            batch = []
+            first = False
+    if batch:
+        yield (b'' if first else b',') + b','.join(batch)
+    yield b']'
+
+
+def stream_json(rows, batch_size=500, on_close=None, key=None, extra=None):
+    """Flask response streaming row dicts as a JSON array, or as {**extra, key: [...]}.
+
+    The first row is produced before the response is built, so query and
+    fetch errors still reach the handler's error path and become a 500.
+    on_close runs once the response is done, even if the client disconnects
+    before the body is sent.
+    """
+    from flask import Response
+
+    rows = iter(rows)
+    try:
+        head = next(rows, None)
+    except Exception:
+        if on_close:
+            on_close()
+        raise
+    body = iter_json_array(itertools.chain([head], rows) if head is not None else iter(()), batch_size)
+
+    if key is not None:
+        opening = dumps(dict(extra or {}, **{key: None}))[:-len(b'null}')]
+        body = itertools.chain([opening], body, [b'}'])
+
+    response = Response(body, mimetype='application/json')
+    if on_close:
+        response.call_on_close(on_close)
+    return response
+
+
+def stream_rows(cursor, conn=None, batch_size=500, transform=None, key=None, extra=None):
+    """Flask response streaming the cursor's result set; the connection is closed afterwards"""
+    return stream_json(iter_rows(cursor, batch_size, transform), batch_size,
+                       conn.close if conn is not None else None, key, extra)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Network control for browser sessions.
+
+Third-party trackers, ads and analytics are refused inside Chrome through the
+DevTools Network.setBlockedURLs command, so page traffic (HTTP and HTTPS) goes
+straight to the site with no proxy in between. Static assets are reused across
+sessions through Chrome's own disk cache: each session claims one of the
+persistent cache directories under network_cache/ for its lifetime, so a
+directory is only ever open in one browser and the next session on the node
+starts warm. Hits, misses, blocked requests and bytes served from the cache are
+tallied from Chrome's performance log.
+
+Offline check of the blocking patterns, cache slot claims and log tally:
+    python network_control.py
+"""
+
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+
+from browser_profiles import claim_file, release_claims
+
+NETWORK_CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'network_cache')
+
+DEFAULT_BLOCKLIST = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'adservice.google.com', 'facebook.net', 'connect.facebook.com',
+    'hotjar.com', 'clarity.ms', 'criteo.com', 'criteo.net', 'taboola.com', 'outbrain.com',
+    'moengage.com', 'branch.io', 'amplitude.com', 'mixpanel.com', 'segment.io', 'newrelic.com',
+    'nr-data.net', 'sentry.io', 'appsflyer.com', 'clevertap.com', 'webengage.com'
+]
+
+MAX_CACHE_SLOTS = 64
+
+
+class NetworkPolicy:
+    """Blocklist and cache settings for a session"""
+
+    def __init__(self, blocklist=None, cache_root=NETWORK_CACHE_ROOT, cache_max_bytes=256 * 1024 * 1024):
+        self.blocklist = [domain.lower() for domain in (blocklist if blocklist is not None else DEFAULT_BLOCKLIST)]
+        self.cache_root = cache_root
+        self.cache_max_bytes = cache_max_bytes
+
+    def blocked_url_patterns(self):
+        """Network.setBlockedURLs patterns matching each domain and its subdomains"""
+        patterns = []
+        for domain in self.blocklist:
+            patterns.extend([f"*://{domain}/*", f"*://*.{domain}/*"])
+        return patterns
+
+
+class NetworkStats:
+    """Per-session counters for blocked and cached traffic"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.blocked = 0
+        self.blocked_by_domain = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_from_network = 0
+        self.bytes_saved = 0
+        self.urls = {}
+        self.cached_requests = set()
+
+    def record_event(self, method, params):
+        """Tally one DevTools Network event from the performance log"""
+        request_id = params.get('requestId')
+        with self.lock:
+            if method == 'Network.requestWillBeSent':
+                self.requests += 1
+                self.urls[request_id] = params.get('request', {}).get('url', '')
+            elif method == 'Network.responseReceived':
+                if params.get('response', {}).get('fromDiskCache'):
+                    self.cache_hits += 1
+                    self.cached_requests.add(request_id)
+                else:
+                    self.cache_misses += 1
+            elif method == 'Network.dataReceived' and request_id in self.cached_requests:
+                self.bytes_saved += params.get('dataLength', 0)
+            elif method == 'Network.loadingFinished':
+                if request_id not in self.cached_requests:
+                    self.bytes_from_network += int(params.get('encodedDataLength', 0))
+                self._forget(request_id)
+            elif method == 'Network.loadingFailed':
+                if params.get('blockedReason'):
+                    host = urlsplit(self.urls.get(request_id, '')).hostname or 'unknown'
+                    self.blocked += 1
+                    self.blocked_by_domain[host] = self.blocked_by_domain.get(host, 0) + 1
+                self._forget(request_id)
+
+    def _forget(self, request_id):
+        self.urls.pop(request_id, None)
+        self.cached_requests.discard(request_id)
+
+    def summary(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'blocked': self.blocked,
+                'blocked_by_domain': dict(self.blocked_by_domain),
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'bytes_from_network': self.bytes_from_network,
+                'bytes_saved': self.bytes_saved
+            }
+
+
+class NetworkController:
+    """Request blocking and a cross-session disk cache for one browser session"""
+
+    def __init__(self, policy=None):
+        self.policy = policy or NetworkPolicy()
+        self.stats = NetworkStats()
+        self.cache_dir = None
+        self.cache_claim = None
+
+    def start(self):
+        """Claim a cache directory no other live browser on this node is using"""
+        for slot in range(MAX_CACHE_SLOTS):
+            cache_dir = os.path.join(self.policy.cache_root, f"slot-{slot}")
+            claim = claim_file(os.path.join(self.policy.cache_root, 'claims', f"slot-{slot}"))
+            if claim:
+                self.cache_dir, self.cache_claim = cache_dir, claim
+                break
+        else:
+            print("⚠️ All network cache slots are in use; this session runs without a shared cache")
+        return self
+
+    def apply_to_options(self, chrome_options):
+        """Point the browser at the claimed cache and turn on network performance logging"""
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            chrome_options.add_argument(f"--disk-cache-dir={self.cache_dir}")
+            chrome_options.add_argument(f"--disk-cache-size={self.policy.cache_max_bytes}")
+
+        logging_prefs = dict(chrome_options.capabilities.get('goog:loggingPrefs') or {}, performance='ALL')
+        chrome_options.set_capability('goog:loggingPrefs', logging_prefs)
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+    def attach(self, driver):
+        """Install the blocklist in the running browser"""
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.policy.blocked_url_patterns()})
+
+    def collect(self, driver):
+        """Drain the performance log into the session counters"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method', '').startswith('Network.'):
+                self.stats.record_event(message['method'], message.get('params', {}))
+
+    def stop(self, driver=None):
+        """Release the cache directory and return the session's network summary"""
+        if driver:
+            self.collect(driver)
+        if self.cache_claim:
+            release_claims([self.cache_claim])
+            self.cache_claim = None
+        return dict(self.stats.summary(), cache_dir=self.cache_dir)
+
+
+def run_fixture_check():
+    """Exercise blocking patterns, cache slot claims and the log tally offline"""
+    import fnmatch
+    import tempfile
+
+    policy = NetworkPolicy(blocklist=['tracker.invalid'], cache_root=tempfile.mkdtemp())
+    patterns = policy.blocked_url_patterns()
+    assert any(fnmatch.fnmatch("https://cdn.tracker.invalid/t.js", p) for p in patterns)
+    assert not any(fnmatch.fnmatch("https://www.example.com/?ref=tracker.invalid", p) for p in patterns)
+
+    first = NetworkController(policy).start()
+    second = NetworkController(policy).start()
+    assert first.cache_dir != second.cache_dir
+
+    def log(method, **params):
+        return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+    class FakeDriver:
+        def get_log(self, kind):
+            return [
+                log('Network.requestWillBeSent', requestId='1', request={'url': 'https://www.example.com/app.css'}),
+                log('Network.responseReceived', requestId='1', response={'fromDiskCache': True}),
+                log('Network.dataReceived', requestId='1', dataLength=10000),
+                log('Network.loadingFinished', requestId='1', encodedDataLength=0),
+                log('Network.requestWillBeSent', requestId='2', request={'url': 'https://www.example.com/'}),
+                log('Network.responseReceived', requestId='2', response={'fromDiskCache': False}),
+                log('Network.loadingFinished', requestId='2', encodedDataLength=2500),
+                log('Network.requestWillBeSent', requestId='3', request={'url': 'https://cdn.tracker.invalid/t.js'}),
+                log('Network.loadingFailed', requestId='3', blockedReason='inspector'),
+            ]
+
+    summary = first.stop(FakeDriver())
+    reused = NetworkController(policy).start()
+    assert reused.cache_dir == first.cache_dir
+    reused.stop()
+    second.stop()
+
+    assert summary['cache_hits'] == 1 and summary['cache_misses'] == 1 and summary['bytes_saved'] == 10000
+    assert summary['blocked_by_domain'] == {'cdn.tracker.invalid': 1} and summary['bytes_from_network'] == 2500
+    print(f"✓ Network control fixture check passed: {summary}")
+    return summary
+
+
+if __name__ == "__main__":
+    run_fixture_check()
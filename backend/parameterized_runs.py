@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from json_stream import iter_rows
+from test_executor import TestExecutor
+
+
+def decode_data_row(row):
+    """Parse a data row dict's stored parameters"""
+    row['parameters'] = json.loads(row['parameters']) if row['parameters'] else {}
+    row['enabled'] = bool(row['enabled'])
+    return row
+
+
+class DataDrivenRunner:
+    """Fan one step table out over the parameter rows stored alongside it"""
+
+    def __init__(self, connection_factory, executor_factory=TestExecutor, max_workers=4):
+        self.connection_factory = connection_factory
+        self.executor_factory = executor_factory
+        self.max_workers = max_workers
+
+    def data_table_name(self, testcase_name):
+        return f"{testcase_name.replace(' ', '_').replace('-', '_')}_Data"
+
+    def ensure_table(self, cursor, testcase_name):
+        """Create the test case's parameter table if not exists"""
+        data_table_name = self.data_table_name(testcase_name)
+        cursor.execute(f"""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='{data_table_name}' AND xtype='U')
+            CREATE TABLE [{data_table_name}] (
+                row_id INT IDENTITY(1,1) PRIMARY KEY,
+                data_set_name NVARCHAR(255),
+                parameters NVARCHAR(MAX),
+                enabled BIT DEFAULT 1,
+                created_date DATETIME DEFAULT GETDATE()
+            )
+        """)
+
+    def add_rows(self, testcase_name, rows):
+        """Store parameter rows, each {'data_set_name': ..., 'parameters': {...}}"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        self.ensure_table(cursor, testcase_name)
+
+        cursor.executemany(f"""
+            INSERT INTO [{self.data_table_name(testcase_name)}] (data_set_name, parameters)
+            VALUES (?, ?)
+        """, [(row.get('data_set_name'), json.dumps(row['parameters'])) for row in rows])
+
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    def get_rows(self, testcase_name, enabled_only=True):
+        conn = self.connection_factory()
+        rows = list(iter_rows(self.query_rows(conn, testcase_name, enabled_only), transform=decode_data_row))
+        conn.close()
+        return rows
+
+    def query_rows(self, conn, testcase_name, enabled_only=True):
+        """Execute the data row listing for a test case and return the cursor"""
+        cursor = conn.cursor()
+        self.ensure_table(cursor, testcase_name)
+        conn.commit()
+
+        query = f"SELECT row_id, data_set_name, parameters, enabled FROM [{self.data_table_name(testcase_name)}]"
+        if enabled_only:
+            query += " WHERE enabled = 1"
+        cursor.execute(query + " ORDER BY row_id")
+        return cursor
+
+    def run(self, testcase_name, row_ids=None):
+        """Execute the step table once per data row, in parallel"""
+        executor = self.executor_factory()
+        test_steps = executor.read_test_steps_from_db(testcase_name)
+        if not test_steps:
+            raise RuntimeError("No test steps found in database")
+
+        rows = self.get_rows(testcase_name)
+        if row_ids:
+            rows = [row for row in rows if row['row_id'] in row_ids]
+        if not rows:
+            raise RuntimeError(f"No parameter rows found for {testcase_name}")
+
+        # Fail fast on rows that cannot resolve every placeholder
+        for row in rows:
+            executor.apply_parameters(test_steps, row['parameters'])
+
+        print(f"🧮 Running {testcase_name} over {len(rows)} data row(s) with {self.max_workers} worker(s)")
+        suite_start = time.time()
+        lock = threading.Lock()
+        results = []
+
+        def run_row(row):
+            result = self.executor_factory().execute_test_case(
+                testcase_name,
+                test_mode='Data-Driven',
+                test_steps=test_steps,
+                parameters=row['parameters']
+            )
+            with lock:
+                results.append(dict(result, row_id=row['row_id'], data_set_name=row['data_set_name']))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(run_row, rows))
+
+        results.sort(key=lambda r: r['row_id'])
+        failed = [r['row_id'] for r in results if r.get('status') != 'PASS']
+        return {
+            'success': True,
+            'status': 'PASS' if not failed else 'FAIL',
+            'total_rows': len(results),
+            'passed_rows': len(results) - len(failed),
+            'failed_rows': failed,
+            'wall_clock_seconds': round(time.time() - suite_start, 2),
+            'results': results
+        }
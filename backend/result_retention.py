@@ -0,0 +1,237 @@
+import gzip
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from json_stream import iter_rows
+from time_utils import parse_execution_time
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+ARCHIVE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'result_archive')
+
+MONTH_PATTERN = re.compile(r'^\d{4}-\d{2}$')
+
+RESULT_COLUMNS = ['result_id', 'testcase_name', 'tc_id', 'test_mode', 'status', 'total_steps', 'passed_steps',
+                  'failed_steps', 'execution_time', 'test_data', 'step_results', 'error_message', 'execution_date']
+
+
+class ColumnarArchive:
+    """Monthly columnar files of raw result rows: Parquet when pyarrow is available,
+    otherwise gzip-compressed column arrays."""
+
+    def __init__(self, root=ARCHIVE_ROOT):
+        self.root = root
+
+    def _path(self, table_name, month, extension):
+        if not MONTH_PATTERN.fullmatch(month):
+            raise ValueError(f"Invalid archive month '{month}', expected YYYY-MM")
+        return os.path.join(self.root, table_name, f"{month}{extension}")
+
+    def months(self, table_name):
+        directory = os.path.join(self.root, table_name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted({name.split('.')[0] for name in os.listdir(directory) if not name.endswith('.tmp')})
+
+    def read(self, table_name, month):
+        """Read one month partition back as a list of row dicts"""
+        parquet_path = self._path(table_name, month, '.parquet')
+        if os.path.exists(parquet_path):
+            if pyarrow is None:
+                raise RuntimeError("pyarrow is required to read Parquet archives")
+            return pyarrow.parquet.read_table(parquet_path).to_pylist()
+
+        column_path = self._path(table_name, month, '.json.gz')
+        if not os.path.exists(column_path):
+            return []
+        with gzip.open(column_path, 'rt', encoding='utf-8') as f:
+            columns = json.load(f)['columns']
+        rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        for row in rows:
+            if row['execution_date']:
+                row['execution_date'] = datetime.fromisoformat(row['execution_date'])
+        return rows
+
+    def append(self, table_name, month, rows):
+        """Merge rows into a month partition, rewriting it atomically"""
+        existing_ids = set()
+        merged = self.read(table_name, month)
+        existing_ids.update(row['result_id'] for row in merged)
+        merged.extend(row for row in rows if row['result_id'] not in existing_ids)
+        merged.sort(key=lambda row: row['result_id'])
+
+        columns = {name: [row.get(name) for row in merged] for name in RESULT_COLUMNS}
+        os.makedirs(os.path.join(self.root, table_name), exist_ok=True)
+
+        if pyarrow is not None:
+            path = self._path(table_name, month, '.parquet')
+            tmp_path = f"{path}.tmp"
+            pyarrow.parquet.write_table(pyarrow.table(columns), tmp_path, compression='zstd')
+        else:
+            path = self._path(table_name, month, '.json.gz')
+            tmp_path = f"{path}.tmp"
+            columns['execution_date'] = [d.isoformat() if d else None for d in columns['execution_date']]
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=9) as f:
+                json.dump({'columns': columns}, f, separators=(',', ':'))
+
+        os.replace(tmp_path, path)
+        for stale_extension in ('.parquet', '.json.gz'):
+            stale_path = self._path(table_name, month, stale_extension)
+            if stale_path != path and os.path.exists(stale_path):
+                os.remove(stale_path)
+        return len(merged)
+
+
+class ResultRetention:
+    """Keep recent runs in the _Results tables, roll older ones up and archive them"""
+
+    def __init__(self, connection_factory, hot_days=30, archive=None):
+        self.connection_factory = connection_factory
+        self.hot_days = hot_days
+        self.archive = archive or ColumnarArchive()
+
+    def ensure_rollup_table(self, cursor):
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='ResultRollups' AND xtype='U')
+            CREATE TABLE ResultRollups (
+                testcase_name NVARCHAR(255),
+                run_date DATE,
+                runs INT,
+                passed_runs INT,
+                failed_runs INT,
+                total_execution_seconds FLOAT,
+                max_execution_seconds FLOAT,
+                PRIMARY KEY (testcase_name, run_date)
+            )
+        """)
+
+    def results_tables(self, cursor):
+        cursor.execute("SELECT name FROM sysobjects WHERE xtype='U' AND name LIKE '%[_]Results'")
+        return [row[0] for row in cursor.fetchall()]
+
+    def run(self):
+        """Compact every results table; returns per-table counts"""
+        cutoff = datetime.combine(datetime.now().date() - timedelta(days=self.hot_days), datetime.min.time())
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        self.ensure_rollup_table(cursor)
+        conn.commit()
+
+        summary = {}
+        for table_name in self.results_tables(cursor):
+            try:
+                summary[table_name] = self.compact_table(conn, table_name, cutoff)
+            except Exception as e:
+                conn.rollback()
+                print(f"✗ Error compacting {table_name}: {str(e)}")
+                summary[table_name] = {'error': str(e)}
+
+        conn.close()
+        return {'cutoff': cutoff.isoformat(), 'tables': summary}
+
+    def compact_table(self, conn, table_name, cutoff):
+        """Archive, roll up and delete out-of-window rows one month at a time,
+        committing after each month so only one month is ever held in memory"""
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT MIN(execution_date) FROM [{table_name}] WHERE execution_date < ?", (cutoff,))
+        oldest = cursor.fetchone()[0]
+        summary = {'archived': 0, 'rolled_up_days': 0, 'months': []}
+        if oldest is None:
+            return summary
+
+        month_start = datetime(oldest.year, oldest.month, 1)
+        while month_start < cutoff:
+            next_month = (month_start + timedelta(days=32)).replace(day=1)
+            archived, rolled_up_days = self.compact_month(conn, table_name, month_start, min(next_month, cutoff))
+            if archived:
+                summary['archived'] += archived
+                summary['rolled_up_days'] += rolled_up_days
+                summary['months'].append(month_start.strftime('%Y-%m'))
+            month_start = next_month
+
+        print(f"🗄️ {table_name}: archived {summary['archived']} row(s) across {len(summary['months'])} month(s)")
+        return summary
+
+    def compact_month(self, conn, table_name, start, end):
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {', '.join(RESULT_COLUMNS)} FROM [{table_name}]
+            WHERE execution_date >= ? AND execution_date < ?
+            ORDER BY result_id
+        """, (start, end))
+        rows = list(iter_rows(cursor))
+        if not rows:
+            return 0, 0
+
+        # Archive first: raw rows are only deleted once they are safely on disk
+        self.archive.append(table_name, start.strftime('%Y-%m'), rows)
+
+        testcase_name = table_name[:-len('_Results')]
+        rollups = defaultdict(lambda: {'runs': 0, 'passed': 0, 'failed': 0, 'total': 0.0, 'max': 0.0})
+        for row in rows:
+            rollup = rollups[row['execution_date'].date()]
+            seconds = parse_execution_time(row['execution_time']) or 0.0
+            rollup['runs'] += 1
+            rollup['passed' if row['status'] == 'PASS' else 'failed'] += 1
+            rollup['total'] += seconds
+            rollup['max'] = max(rollup['max'], seconds)
+
+        for run_date, rollup in rollups.items():
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM ResultRollups WHERE testcase_name = ? AND run_date = ?)
+                INSERT INTO ResultRollups VALUES (?, ?, 0, 0, 0, 0, 0)
+            """, (testcase_name, run_date, testcase_name, run_date))
+            cursor.execute("""
+                UPDATE ResultRollups
+                SET runs = runs + ?, passed_runs = passed_runs + ?, failed_runs = failed_runs + ?,
+                    total_execution_seconds = total_execution_seconds + ?,
+                    max_execution_seconds = CASE WHEN max_execution_seconds > ? THEN max_execution_seconds ELSE ? END
+                WHERE testcase_name = ? AND run_date = ?
+            """, (rollup['runs'], rollup['passed'], rollup['failed'], rollup['total'],
+                  rollup['max'], rollup['max'], testcase_name, run_date))
+
+        # Rollups and the delete commit together, so a retried month never counts its rows twice
+        cursor.execute(f"""
+            DELETE FROM [{table_name}]
+            WHERE execution_date >= ? AND execution_date < ? AND result_id <= ?
+        """, (start, end, rows[-1]['result_id']))
+        conn.commit()
+        return len(rows), len(rollups)
+
+    def query_rollups(self, conn, testcase_name):
+        """Execute the daily rollup query for a test case and return the cursor"""
+        cursor = conn.cursor()
+        self.ensure_rollup_table(cursor)
+        conn.commit()
+
+        cursor.execute("""
+            SELECT run_date, runs, passed_runs, failed_runs,
+                   CASE WHEN runs > 0 THEN ROUND(total_execution_seconds / runs, 2) END AS avg_execution_seconds,
+                   max_execution_seconds
+            FROM ResultRollups WHERE testcase_name = ?
+            ORDER BY run_date DESC
+        """, (testcase_name.replace(' ', '_').replace('-', '_'),))
+        return cursor
+
+    def get_rollups(self, testcase_name):
+        conn = self.connection_factory()
+        rollups = list(iter_rows(self.query_rollups(conn, testcase_name)))
+        conn.close()
+        return rollups
+
+    def iter_archive(self, testcase_name, months=None):
+        """Yield archived raw results for a test case one month partition at a time"""
+        table_name = f"{testcase_name.replace(' ', '_').replace('-', '_')}_Results"
+        for month in months or self.archive.months(table_name):
+            yield from self.archive.read(table_name, month)
+
+    def read_archive(self, testcase_name, months=None):
+        """Read archived raw results for a test case, optionally for given YYYY-MM months"""
+        return list(self.iter_archive(testcase_name, months))
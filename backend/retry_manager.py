@@ -0,0 +1,373 @@
+import time
+import uuid
+
+from json_stream import iter_rows
+from test_executor import TestExecutor
+
+
+class RetryManager:
+    """Rerun failed test cases with a retry budget and track per-case flakiness"""
+
+    def __init__(self, connection_factory, executor_factory=TestExecutor, max_retries=2,
+                 backoff_seconds=2.0, backoff_factor=2.0, quarantine_threshold=0.3, quarantine_min_runs=5):
+        self.connection_factory = connection_factory
+        self.executor_factory = executor_factory
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_factor = backoff_factor
+        self.quarantine_threshold = quarantine_threshold
+        self.quarantine_min_runs = quarantine_min_runs
+
+    def ensure_tables(self):
+        """Create suite, attempt and flakiness tables if not exists"""
+        try:
+            conn = self.connection_factory()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='TestSuiteRuns' AND xtype='U')
+                CREATE TABLE TestSuiteRuns (
+                    suite_run_id NVARCHAR(64),
+                    testcase_name NVARCHAR(255),
+                    position INT,
+                    created_date DATETIME DEFAULT GETDATE(),
+                    PRIMARY KEY (suite_run_id, testcase_name)
+                )
+            """)
+
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='TestRunAttempts' AND xtype='U')
+                CREATE TABLE TestRunAttempts (
+                    attempt_id INT IDENTITY(1,1) PRIMARY KEY,
+                    suite_run_id NVARCHAR(64),
+                    testcase_name NVARCHAR(255),
+                    attempt_no INT,
+                    lane NVARCHAR(20) DEFAULT 'main',
+                    status NVARCHAR(20),
+                    is_flaky BIT DEFAULT 0,
+                    execution_time NVARCHAR(50),
+                    error_message NVARCHAR(1000),
+                    attempt_date DATETIME DEFAULT GETDATE()
+                )
+            """)
+
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='TestCaseFlakiness' AND xtype='U')
+                CREATE TABLE TestCaseFlakiness (
+                    testcase_name NVARCHAR(255) PRIMARY KEY,
+                    total_runs INT DEFAULT 0,
+                    failed_runs INT DEFAULT 0,
+                    flaky_runs INT DEFAULT 0,
+                    last_status NVARCHAR(20),
+                    quarantined BIT DEFAULT 0,
+                    updated_date DATETIME DEFAULT GETDATE()
+                )
+            """)
+
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            print(f"✗ Error creating retry tables: {str(e)}")
+            raise
+
+    def run_test_case(self, testcase_name, suite_run_id=None):
+        """Execute a single test case, retrying it while it fails"""
+        suite = self.run_suite([testcase_name], suite_run_id)
+        return suite['results'][testcase_name]
+
+    def run_suite(self, testcase_names, suite_run_id=None, attempts_used=None):
+        """Execute test cases, then rerun only the failed ones with backoff.
+
+        Quarantined cases run after the main lane and never affect the suite status.
+        attempts_used maps a case to the attempts it already made in this suite run.
+        """
+        self.ensure_tables()
+        suite_run_id = suite_run_id or uuid.uuid4().hex
+        self.record_suite(suite_run_id, testcase_names)
+        quarantined = self.get_quarantined_testcases()
+
+        main_lane = [name for name in testcase_names if name not in quarantined]
+        quarantine_lane = [name for name in testcase_names if name in quarantined]
+
+        print(f"🔁 Suite run {suite_run_id}: {len(main_lane)} main, {len(quarantine_lane)} quarantined")
+
+        results = {}
+        results.update(self._run_lane(main_lane, 'main', suite_run_id, attempts_used))
+        results.update(self._run_lane(quarantine_lane, 'quarantine', suite_run_id, attempts_used))
+
+        main_failed = [name for name in main_lane if results[name]['status'] != 'PASS']
+        return {
+            'success': True,
+            'suite_run_id': suite_run_id,
+            'status': 'PASS' if not main_failed else 'FAIL',
+            'failed_testcases': main_failed,
+            'flaky_testcases': [name for name, result in results.items() if result['flaky']],
+            'quarantined_testcases': quarantine_lane,
+            'results': results
+        }
+
+    def resume_suite(self, suite_run_id):
+        """Continue an interrupted suite run, skipping cases it already finished"""
+        self.ensure_tables()
+        testcase_names = self.get_suite_testcases(suite_run_id)
+        if not testcase_names:
+            raise RuntimeError(f"No suite run found with id {suite_run_id}")
+        attempts = self.get_attempt_counts(suite_run_id)
+        completed = self.get_completed_testcases(suite_run_id, attempts)
+        remaining = [name for name in testcase_names if name not in completed]
+        print(f"♻️ Resuming suite run {suite_run_id}: {len(completed)} done, {len(remaining)} remaining")
+
+        attempts_used = {name: attempts[name]['attempts'] for name in remaining if name in attempts}
+        result = self.run_suite(remaining, suite_run_id, attempts_used)
+        result['skipped_testcases'] = [name for name in testcase_names if name in completed]
+        return result
+
+    def record_suite(self, suite_run_id, testcase_names):
+        """Store which cases belong to a suite run so it can be resumed without the caller's list"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        for position, testcase_name in enumerate(testcase_names):
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM TestSuiteRuns WHERE suite_run_id = ? AND testcase_name = ?)
+                INSERT INTO TestSuiteRuns (suite_run_id, testcase_name, position) VALUES (?, ?, ?)
+            """, (suite_run_id, testcase_name, suite_run_id, testcase_name, position))
+        conn.commit()
+        conn.close()
+
+    def get_suite_testcases(self, suite_run_id):
+        """Cases of a suite run in their original order"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute("SELECT testcase_name FROM TestSuiteRuns WHERE suite_run_id = ? ORDER BY position",
+                       (suite_run_id,))
+        names = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return names
+
+    def get_attempt_counts(self, suite_run_id):
+        """Recorded attempts per case of a suite run, with their pass and error counts"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT testcase_name,
+                   SUM(CASE WHEN status = 'PASS' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'ERROR' THEN 1 ELSE 0 END),
+                   COUNT(*)
+            FROM TestRunAttempts
+            WHERE suite_run_id = ?
+            GROUP BY testcase_name
+        """, (suite_run_id,))
+
+        attempts = {row[0]: {'passed': row[1], 'errors': row[2], 'attempts': row[3]} for row in cursor.fetchall()}
+        conn.close()
+        return attempts
+
+    def get_completed_testcases(self, suite_run_id, attempts=None):
+        """Cases of a suite run that passed or used up their retry budget"""
+        attempts = attempts if attempts is not None else self.get_attempt_counts(suite_run_id)
+        return {name for name, counts in attempts.items()
+                if counts['passed'] or counts['errors'] or counts['attempts'] >= self.max_retries + 1}
+
+    def _run_lane(self, testcase_names, lane, suite_run_id, attempts_used=None):
+        """Run a lane once, then retry the failed cases round by round.
+
+        Cases resumed from an earlier run continue their attempt numbering and
+        only get what is left of the retry budget.
+        """
+        results = {}
+        history = {name: [] for name in testcase_names}
+        next_attempt = {name: (attempts_used or {}).get(name, 0) + 1 for name in testcase_names}
+        pending = [name for name in testcase_names if next_attempt[name] <= self.max_retries + 1]
+
+        for round_no in range(1, self.max_retries + 2):
+            if not pending:
+                break
+
+            if round_no > 1:
+                delay = self.backoff_seconds * (self.backoff_factor ** (round_no - 2))
+                print(f"⏳ Retrying {len(pending)} failed test case(s) in {delay:.1f}s (round {round_no})")
+                time.sleep(delay)
+
+            still_failing = []
+            for testcase_name in pending:
+                attempt_no = next_attempt[testcase_name]
+                next_attempt[testcase_name] += 1
+                result = self._execute_attempt(testcase_name, attempt_no, suite_run_id)
+                history[testcase_name].append(result['status'])
+                self.record_attempt(suite_run_id, testcase_name, attempt_no, lane, result)
+                results[testcase_name] = result
+
+                if self._is_retryable(result) and next_attempt[testcase_name] <= self.max_retries + 1:
+                    still_failing.append(testcase_name)
+
+            pending = still_failing
+
+        for testcase_name in testcase_names:
+            statuses = history[testcase_name]
+            if not statuses:
+                continue
+            # A browser crash that was resumed to a pass is not the test being flaky
+            flaky = statuses[-1] == 'PASS' and 'FAIL' in statuses
+            if flaky:
+                self.mark_flaky(suite_run_id, testcase_name)
+                print(f"⚠️ {testcase_name} passed on attempt {next_attempt[testcase_name] - 1} and is marked flaky")
+
+            results[testcase_name] = dict(results[testcase_name], attempts=next_attempt[testcase_name] - 1,
+                                          flaky=flaky, lane=lane)
+            self.update_flakiness(testcase_name, results[testcase_name]['status'], flaky)
+
+        return results
+
+    def _execute_attempt(self, testcase_name, attempt_no, suite_run_id):
+        """Run one attempt on a fresh executor, continuing an interrupted one if checkpointed"""
+        executor = self.executor_factory()
+        checkpoint = executor.checkpoints.find_running(suite_run_id, testcase_name)
+        if checkpoint:
+            result = executor.resume_test_case(checkpoint['run_id'])
+        else:
+            test_mode = 'Automated' if attempt_no == 1 else f'Automated-Retry{attempt_no - 1}'
+            result = executor.execute_test_case(testcase_name, test_mode=test_mode, suite_run_id=suite_run_id)
+        if result.get('session_lost'):
+            result = dict(result, status='INTERRUPTED')
+        elif not result.get('success'):
+            result = dict(result, status='ERROR')
+        return result
+
+    def _is_retryable(self, result):
+        """Step failures and lost browser sessions are retried; critical errors (no steps, DB) are not"""
+        return result.get('status') == 'INTERRUPTED' or (result.get('success') and result.get('status') == 'FAIL')
+
+    def record_attempt(self, suite_run_id, testcase_name, attempt_no, lane, result):
+        """Record a single execution attempt"""
+        try:
+            conn = self.connection_factory()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                INSERT INTO TestRunAttempts
+                (suite_run_id, testcase_name, attempt_no, lane, status, execution_time, error_message)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                suite_run_id,
+                testcase_name,
+                attempt_no,
+                lane,
+                result['status'],
+                result.get('execution_time'),
+                (result.get('error_message') or result.get('error') or '')[:1000]
+            ))
+
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            print(f"✗ Error recording attempt: {str(e)}")
+
+    def mark_flaky(self, suite_run_id, testcase_name):
+        """Flag every attempt of a case in this suite run as flaky"""
+        try:
+            conn = self.connection_factory()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                UPDATE TestRunAttempts SET is_flaky = 1
+                WHERE suite_run_id = ? AND testcase_name = ?
+            """, (suite_run_id, testcase_name))
+
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            print(f"✗ Error marking attempts flaky: {str(e)}")
+
+    def update_flakiness(self, testcase_name, status, flaky):
+        """Update flakiness history and quarantine chronically flaky cases"""
+        try:
+            conn = self.connection_factory()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM TestCaseFlakiness WHERE testcase_name = ?)
+                INSERT INTO TestCaseFlakiness (testcase_name) VALUES (?)
+            """, (testcase_name, testcase_name))
+
+            cursor.execute("""
+                UPDATE TestCaseFlakiness
+                SET total_runs = total_runs + 1,
+                    failed_runs = failed_runs + ?,
+                    flaky_runs = flaky_runs + ?,
+                    last_status = ?,
+                    updated_date = GETDATE()
+                WHERE testcase_name = ?
+            """, (0 if status == 'PASS' else 1, 1 if flaky else 0, status, testcase_name))
+
+            row = cursor.execute("""
+                SELECT total_runs, flaky_runs, quarantined FROM TestCaseFlakiness WHERE testcase_name = ?
+            """, (testcase_name,)).fetchone()
+
+            total_runs, flaky_runs, quarantined = row[0], row[1], row[2]
+            if (not quarantined and total_runs >= self.quarantine_min_runs
+                    and flaky_runs / total_runs >= self.quarantine_threshold):
+                cursor.execute("UPDATE TestCaseFlakiness SET quarantined = 1 WHERE testcase_name = ?", (testcase_name,))
+                print(f"🚧 {testcase_name} quarantined ({flaky_runs}/{total_runs} flaky runs)")
+
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            print(f"✗ Error updating flakiness history: {str(e)}")
+
+    def get_quarantined_testcases(self):
+        """Get names of quarantined test cases"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute("SELECT testcase_name FROM TestCaseFlakiness WHERE quarantined = 1")
+        names = {row[0] for row in cursor.fetchall()}
+        conn.close()
+        return names
+
+    def set_quarantine(self, testcase_name, quarantined):
+        """Manually quarantine or release a test case; releasing resets its history"""
+        self.ensure_tables()
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM TestCaseFlakiness WHERE testcase_name = ?)
+            INSERT INTO TestCaseFlakiness (testcase_name) VALUES (?)
+        """, (testcase_name, testcase_name))
+
+        if quarantined:
+            cursor.execute("UPDATE TestCaseFlakiness SET quarantined = 1, updated_date = GETDATE() WHERE testcase_name = ?",
+                           (testcase_name,))
+        else:
+            cursor.execute("""
+                UPDATE TestCaseFlakiness
+                SET quarantined = 0, total_runs = 0, failed_runs = 0, flaky_runs = 0, updated_date = GETDATE()
+                WHERE testcase_name = ?
+            """, (testcase_name,))
+
+        conn.commit()
+        conn.close()
+
+    def query_flakiness(self, conn):
+        """Execute the flakiness history query and return the cursor"""
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT testcase_name, total_runs, failed_runs, flaky_runs,
+                   CASE WHEN total_runs > 0 THEN ROUND(CAST(flaky_runs AS FLOAT) / total_runs, 3) ELSE 0.0 END
+                       AS flaky_rate,
+                   last_status, quarantined, updated_date
+            FROM TestCaseFlakiness
+            ORDER BY flaky_runs DESC
+        """)
+        return cursor
+
+    def get_flakiness(self):
+        """Get flakiness history for all test cases"""
+        self.ensure_tables()
+        conn = self.connection_factory()
+        history = list(iter_rows(self.query_flakiness(conn)))
+        conn.close()
+        return history
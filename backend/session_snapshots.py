@@ -0,0 +1,183 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from json_stream import iter_rows
+
+STEP_FINGERPRINT_FIELDS = ('action_type', 'element_name', 'xpath', 'values')
+
+COOKIE_FIELDS = ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry', 'sameSite')
+
+
+def decode_snapshot(snapshot):
+    """Parse the stored browser state of a snapshot row dict"""
+    snapshot['state'] = json.loads(snapshot['state']) if snapshot['state'] else None
+    return snapshot
+
+
+def summarize_snapshot(snapshot):
+    """Replace a snapshot row's stored state with whether it was captured and where it ended"""
+    state = json.loads(snapshot.pop('state')) if snapshot['state'] else None
+    snapshot.pop('fingerprint', None)
+    snapshot['captured'] = state is not None
+    snapshot['final_url'] = state['url'] if state else None
+    return snapshot
+
+
+def fingerprint_steps(steps):
+    """Stable hash of the parts of a step sequence that affect browser state"""
+    payload = [[str(step.get(field) or '').strip() for field in STEP_FINGERPRINT_FIELDS] for step in steps]
+    return hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()
+
+
+def capture_browser_state(driver):
+    """Capture cookies, localStorage, sessionStorage and the current URL"""
+    return {
+        'url': driver.current_url,
+        'cookies': driver.get_cookies(),
+        'local_storage': driver.execute_script("return Object.assign({}, window.localStorage);") or {},
+        'session_storage': driver.execute_script("return Object.assign({}, window.sessionStorage);") or {}
+    }
+
+
+def restore_browser_state(driver, state):
+    """Load a captured state into a freshly launched browser"""
+    parts = urlsplit(state['url'])
+    driver.get(f"{parts.scheme}://{parts.netloc}/")
+
+    driver.delete_all_cookies()
+    for cookie in state['cookies']:
+        try:
+            driver.add_cookie({k: v for k, v in cookie.items() if k in COOKIE_FIELDS})
+        except Exception as e:
+            print(f"Could not restore cookie {cookie.get('name')}: {str(e)}")
+
+    driver.execute_script("""
+        var local = arguments[0], session = arguments[1];
+        window.localStorage.clear();
+        window.sessionStorage.clear();
+        Object.keys(local).forEach(function (k) { window.localStorage.setItem(k, local[k]); });
+        Object.keys(session).forEach(function (k) { window.sessionStorage.setItem(k, session[k]); });
+    """, state['local_storage'], state['session_storage'])
+
+    driver.get(state['url'])
+
+
+class SessionSnapshotManager:
+    """Named setup sequences whose resulting browser state is captured once and reused"""
+
+    def __init__(self, connection_factory, read_steps):
+        self.connection_factory = connection_factory
+        self.read_steps = read_steps
+
+    def ensure_table(self, cursor):
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='SessionSnapshots' AND xtype='U')
+            CREATE TABLE SessionSnapshots (
+                snapshot_name NVARCHAR(255) PRIMARY KEY,
+                setup_testcase NVARCHAR(255) NOT NULL,
+                ttl_seconds INT DEFAULT 3600,
+                fingerprint NVARCHAR(64),
+                state NVARCHAR(MAX),
+                captured_date DATETIME,
+                created_date DATETIME DEFAULT GETDATE()
+            )
+        """)
+
+    def register(self, snapshot_name, setup_testcase, ttl_seconds=3600):
+        """Register (or redefine) a named setup sequence; any old snapshot is dropped"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        self.ensure_table(cursor)
+
+        cursor.execute("DELETE FROM SessionSnapshots WHERE snapshot_name = ?", (snapshot_name,))
+        cursor.execute("""
+            INSERT INTO SessionSnapshots (snapshot_name, setup_testcase, ttl_seconds)
+            VALUES (?, ?, ?)
+        """, (snapshot_name, setup_testcase, ttl_seconds))
+
+        conn.commit()
+        conn.close()
+
+    def invalidate(self, snapshot_name):
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE SessionSnapshots SET state = NULL, fingerprint = NULL, captured_date = NULL WHERE snapshot_name = ?",
+                       (snapshot_name,))
+        conn.commit()
+        conn.close()
+
+    def list_snapshots(self):
+        conn = self.connection_factory()
+        snapshots = list(iter_rows(self.query_snapshots(conn), transform=decode_snapshot))
+        conn.close()
+        return snapshots
+
+    def query_snapshots(self, conn):
+        """Execute the snapshot listing and return the cursor"""
+        cursor = conn.cursor()
+        self.ensure_table(cursor)
+        conn.commit()
+
+        cursor.execute("""
+            SELECT snapshot_name, setup_testcase, ttl_seconds, fingerprint, state, captured_date
+            FROM SessionSnapshots
+        """)
+        return cursor
+
+    def plan(self, test_steps):
+        """Find the registered setup that is a prefix of these steps.
+
+        Returns None, or a dict with the prefix length and the snapshot state if
+        a fresh one exists whose setup steps have not changed since capture.
+        """
+        try:
+            snapshots = self.list_snapshots()
+        except Exception as e:
+            print(f"⚠️ Session snapshots unavailable: {str(e)}")
+            return None
+
+        best = None
+        for snapshot in snapshots:
+            try:
+                setup_steps = self.read_steps(snapshot['setup_testcase'])
+            except Exception:
+                continue
+
+            prefix_length = len(setup_steps)
+            if not setup_steps or prefix_length > len(test_steps):
+                continue
+
+            fingerprint = fingerprint_steps(setup_steps)
+            if fingerprint_steps(test_steps[:prefix_length]) != fingerprint:
+                continue
+            if best and best['prefix_length'] >= prefix_length:
+                continue
+
+            fresh = (
+                snapshot['state'] is not None
+                and snapshot['fingerprint'] == fingerprint
+                and snapshot['captured_date'] is not None
+                and datetime.now() - snapshot['captured_date'] < timedelta(seconds=snapshot['ttl_seconds'])
+            )
+            best = {
+                'snapshot_name': snapshot['snapshot_name'],
+                'prefix_length': prefix_length,
+                'fingerprint': fingerprint,
+                'state': snapshot['state'] if fresh else None
+            }
+
+        return best
+
+    def save(self, snapshot_name, fingerprint, state):
+        """Store the captured state for a setup sequence"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE SessionSnapshots SET fingerprint = ?, state = ?, captured_date = ?
+            WHERE snapshot_name = ?
+        """, (fingerprint, json.dumps(state), datetime.now(), snapshot_name))
+        conn.commit()
+        conn.close()
+        print(f"📸 Captured session snapshot '{snapshot_name}'")
@@ -0,0 +1,133 @@
+import statistics
+import threading
+import time
+
+from test_executor import TestExecutor
+from time_utils import parse_execution_time
+
+DEFAULT_DURATION_SECONDS = 60.0
+
+
+class SuiteScheduler:
+    """Order and bin-pack test cases across workers using past _Results data"""
+
+    def __init__(self, connection_factory, executor_factory=TestExecutor, history_window=10):
+        self.connection_factory = connection_factory
+        self.executor_factory = executor_factory
+        self.history_window = history_window
+
+    def load_history(self, testcase_names):
+        """Estimate duration and failure rate per test case from its recent results"""
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        history = {}
+
+        for testcase_name in testcase_names:
+            results_table_name = f"{testcase_name.replace(' ', '_').replace('-', '_')}_Results"
+            try:
+                # Only first attempts of plain runs: retry rows (Automated-RetryN) would
+                # count a flaky run several times and data-driven rows time a different workload
+                cursor.execute(f"""
+                    SELECT TOP {int(self.history_window)} execution_time, status
+                    FROM [{results_table_name}]
+                    WHERE test_mode = 'Automated'
+                    ORDER BY execution_date DESC
+                """)
+                rows = cursor.fetchall()
+            except Exception as e:
+                print(f"⚠️ No history for {testcase_name}: {str(e)}")
+                rows = []
+
+            durations = [d for d in (parse_execution_time(row[0]) for row in rows) if d is not None]
+            history[testcase_name] = {
+                'runs': len(rows),
+                'duration': statistics.median(durations) if durations else None,
+                'failure_rate': sum(1 for row in rows if row[1] != 'PASS') / len(rows) if rows else None
+            }
+
+        conn.close()
+        return history
+
+    def plan(self, testcase_names, workers=1, failures_first=False, history=None):
+        """Build a schedule: one ordered lane of test cases per worker.
+
+        Cases are placed longest-first onto the least loaded worker (LPT), which
+        keeps the makespan close to optimal. With failures_first, cases likely to
+        fail are placed first so their results surface early.
+        """
+        history = history if history is not None else self.load_history(testcase_names)
+        known = [h['duration'] for h in history.values() if h['duration'] is not None]
+        fallback_duration = statistics.median(known) if known else DEFAULT_DURATION_SECONDS
+
+        cases = []
+        for testcase_name in testcase_names:
+            case_history = history.get(testcase_name, {})
+            cases.append({
+                'testcase_name': testcase_name,
+                'predicted_seconds': case_history.get('duration') or fallback_duration,
+                'failure_rate': case_history.get('failure_rate') or 0.0,
+                'runs': case_history.get('runs', 0)
+            })
+
+        if failures_first:
+            cases.sort(key=lambda c: (-c['failure_rate'], -c['predicted_seconds']))
+        else:
+            cases.sort(key=lambda c: -c['predicted_seconds'])
+
+        lanes = [{'worker': i, 'testcases': [], 'predicted_seconds': 0.0} for i in range(max(1, workers))]
+        for case in cases:
+            lane = min(lanes, key=lambda l: l['predicted_seconds'])
+            case['predicted_start'] = lane['predicted_seconds']
+            lane['testcases'].append(case)
+            lane['predicted_seconds'] += case['predicted_seconds']
+
+        return {
+            'workers': len(lanes),
+            'failures_first': failures_first,
+            'order': [case['testcase_name'] for case in cases],
+            'lanes': lanes,
+            'predicted_seconds': max(lane['predicted_seconds'] for lane in lanes)
+        }
+
+    def run_local(self, schedule):
+        """Execute each lane on its own thread and report predicted vs actual duration"""
+        suite_start = time.time()
+        results = {}
+        lock = threading.Lock()
+
+        def run_lane(lane):
+            for case in lane['testcases']:
+                case_start = time.time()
+                result = self.executor_factory().execute_test_case(case['testcase_name'])
+                actual = time.time() - case_start
+                with lock:
+                    results[case['testcase_name']] = dict(
+                        result,
+                        worker=lane['worker'],
+                        predicted_seconds=round(case['predicted_seconds'], 2),
+                        actual_seconds=round(actual, 2)
+                    )
+
+        threads = [threading.Thread(target=run_lane, args=(lane,)) for lane in schedule['lanes']]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        actual_seconds = time.time() - suite_start
+        print(f"⏱️ Suite finished in {actual_seconds:.1f}s (predicted {schedule['predicted_seconds']:.1f}s)")
+
+        return {
+            'success': True,
+            'status': 'PASS' if all(r.get('status') == 'PASS' for r in results.values()) else 'FAIL',
+            'predicted_seconds': round(schedule['predicted_seconds'], 2),
+            'actual_seconds': round(actual_seconds, 2),
+            'prediction_error_seconds': round(actual_seconds - schedule['predicted_seconds'], 2),
+            'order': schedule['order'],
+            'results': results
+        }
+
+    def enqueue(self, schedule, job_queue):
+        """Queue the schedule for distributed workers, highest priority first"""
+        order = schedule['order']
+        return [job_queue.enqueue(name, priority=len(order) - position) for position, name in enumerate(order)]
@@ -16,19 +16,99 @@ from selenium.common.exceptions import (
     NoSuchElementException, 
     TimeoutException, 
     StaleElementReferenceException,
-    ElementClickInterceptedException
+    ElementClickInterceptedException,
+    InvalidSessionIdException,
+    NoSuchWindowException,
+    WebDriverException
 )
+from urllib3.exceptions import MaxRetryError
 from webdriver_manager.chrome import ChromeDriverManager
 import pyodbc
 from datetime import datetime, timedelta
 import re
+import json
+import uuid
+
+from artifact_store import get_artifact_capture
+from browser_profiles import get_browser_profile, apply_profile_options, SessionMonitor
+from network_control import NetworkController
+from session_snapshots import SessionSnapshotManager, capture_browser_state, restore_browser_state
+from checkpoints import CheckpointStore
+from json_stream import iter_rows
+
+# Scroll, hit-test and click in a single round trip. Returns null when the
+# click was dispatched, otherwise the reason the scripted path was skipped.
+SCRIPTED_CLICK_JS = """
+    var el = arguments[0];
+    if (!el.isConnected) return 'detached';
+    el.scrollIntoView({behavior: 'instant', block: 'center', inline: 'center'});
+    if (el.disabled) return 'disabled';
+    var rect = el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) return 'not visible';
+    var top = document.elementFromPoint(rect.left + rect.width / 2, rect.top + rect.height / 2);
+    if (top && top !== el && !el.contains(top) && !top.contains(el)) {
+        return 'covered by ' + top.tagName.toLowerCase() + (top.className ? '.' + String(top.className).split(' ')[0] : '');
+    }
+    el.click();
+    return null;
+"""
+
+# chromedriver messages meaning the browser is gone. Only matched against the
+# liveness probe's own error, never a step error: those embed XPaths and page
+# content that can contain any of these words
+SESSION_LOST_MARKERS = ('invalid session id', 'chrome not reachable', 'no such window', 'disconnected',
+                        'session deleted')
+
+
+def is_session_lost_error(error):
+    """Classify an error raised by a bare driver call with no page data in it"""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    if isinstance(error, WebDriverException):
+        return any(marker in (error.msg or '').lower() for marker in SESSION_LOST_MARKERS)
+    # chromedriver itself is gone: the HTTP call to it cannot connect
+    return isinstance(error, (ConnectionError, MaxRetryError))
+
+
+# Columns that outgrow their original NVARCHAR limits on long test cases or large data rows
+WIDENED_RESULT_COLUMNS = ['test_data', 'step_results', 'error_message']
+_widened_results_tables = set()
+
+
+def widen_result_columns(cursor, results_table_name):
+    """Migrate a results table's truncating columns to NVARCHAR(MAX), once per table per process"""
+    if results_table_name in _widened_results_tables:
+        return
+    for column in WIDENED_RESULT_COLUMNS:
+        cursor.execute("""
+            SELECT CHARACTER_MAXIMUM_LENGTH FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_NAME = ? AND COLUMN_NAME = ?
+        """, (results_table_name, column))
+        row = cursor.fetchone()
+        if row and row[0] != -1:
+            cursor.execute(f"ALTER TABLE [{results_table_name}] ALTER COLUMN {column} NVARCHAR(MAX)")
+            print(f"🔧 Widened {results_table_name}.{column} to NVARCHAR(MAX)")
+    _widened_results_tables.add(results_table_name)
+
+
+class SessionLostError(RuntimeError):
+    """The browser session died mid-run; the run can be resumed from its checkpoint"""
+
 
 class TestExecutor:
-    def __init__(self):
+    def __init__(self, browser_profile=None, checkpoint_interval=3):
         self.driver = None
         self.wait = None
         self.fluent_wait = None
         self.actions = None
+        self.run_id = None
+        self.browser_profile = get_browser_profile(browser_profile)
+        self.session_monitor = None
+        self.network_controller = None
+        self.snapshots = SessionSnapshotManager(self.get_db_connection, self.read_test_steps_from_db)
+        self.checkpoints = CheckpointStore(self.get_db_connection)
+        self.checkpoint_interval = checkpoint_interval
+        self.click_stats = {'scripted': 0, 'native': 0, 'js_forced': 0, 'action_chains': 0, 'failed': 0}
         
         # Database configuration
         self.db_config = {
@@ -50,6 +130,11 @@ class TestExecutor:
 
     def launch_browser(self):
         """Initialize WebDriver with optimized settings"""
+        # A repeated OPEN_BROWSER replaces the session instead of leaking its
+        # driver, proxy and monitor thread
+        if self.driver or self.network_controller or self.session_monitor:
+            self.close_browser()
+
         try:
             chrome_options = Options()
             chrome_options.add_argument("--no-sandbox")
@@ -60,6 +145,11 @@ class TestExecutor:
             chrome_options.add_argument("--allow-running-insecure-content")
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             chrome_options.add_experimental_option('useAutomationExtension', False)
+            chrome_options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
+            apply_profile_options(chrome_options, self.browser_profile)
+            if self.browser_profile['network_control']:
+                self.network_controller = NetworkController().start()
+                self.network_controller.apply_to_options(chrome_options)
             
             # Get ChromeDriver path
             driver_path = None
@@ -87,7 +177,8 @@ class TestExecutor:
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             
             # Configure timeouts
-            self.driver.maximize_window()
+            if not self.browser_profile['window_size']:
+                self.driver.maximize_window()
             self.driver.implicitly_wait(5)
             self.driver.set_page_load_timeout(60)
             
@@ -98,7 +189,12 @@ class TestExecutor:
             
             self.actions = ActionChains(self.driver)
             
-            print("✓ Browser launched successfully")
+            if self.network_controller:
+                self.network_controller.attach(self.driver)
+            
+            self.session_monitor = SessionMonitor(self.driver.service.process.pid, self.browser_profile).start()
+            
+            print(f"✓ Browser launched successfully (profile: {self.browser_profile['name']})")
             
         except Exception as e:
             print(f"✗ Error launching browser: {str(e)}")
@@ -117,17 +213,7 @@ class TestExecutor:
                 ORDER BY step_no
             """)
             
-            test_steps = []
-            for row in cursor.fetchall():
-                test_steps.append({
-                    'tc_id': row[0],
-                    'step_no': row[1],
-                    'test_step_description': row[2],
-                    'element_name': row[3],
-                    'action_type': row[4],
-                    'xpath': row[5],
-                    'values': row[6]
-                })
+            test_steps = list(iter_rows(cursor))
             
             conn.close()
             return test_steps
@@ -136,6 +222,19 @@ class TestExecutor:
             print(f"✗ Error reading test steps from database: {str(e)}")
             raise
 
+    def apply_parameters(self, test_steps, parameters):
+        """Resolve ${name} placeholders in step values from a data row"""
+        resolved_steps = []
+        for step in test_steps:
+            values = step['values']
+            if values:
+                missing = [name for name in re.findall(r'\$\{(\w+)\}', values) if name not in parameters]
+                if missing:
+                    raise RuntimeError(f"Step {step['step_no']}: missing parameter(s) {', '.join(missing)}")
+                values = re.sub(r'\$\{(\w+)\}', lambda m: str(parameters[m.group(1)]), values)
+            resolved_steps.append(dict(step, values=values))
+        return resolved_steps
+
     def write_result_to_db(self, testcase_name, result_data):
         """Write test results to database"""
         try:
@@ -143,6 +242,9 @@ class TestExecutor:
             cursor = conn.cursor()
             
             results_table_name = f"{testcase_name.replace(' ', '_').replace('-', '_')}_Results"
+            # Tables created before the NVARCHAR(MAX) columns would truncate long runs
+            widen_result_columns(cursor, results_table_name)
+            conn.commit()
             cursor.execute(f"""
                 INSERT INTO [{results_table_name}] 
                 (testcase_name, tc_id, test_mode, status, total_steps, passed_steps, failed_steps, 
@@ -162,36 +264,72 @@ class TestExecutor:
                 result_data['error_message']
             ))
             
+            result_id = cursor.execute("SELECT @@IDENTITY").fetchone()[0]
             conn.commit()
             conn.close()
             print("✓ Results written to database successfully")
+            return result_id
             
         except Exception as e:
             print(f"✗ Error writing results to database: {str(e)}")
             raise
 
-    def execute_test_case(self, testcase_name):
-        """Execute test case by reading from database"""
+    def execute_test_case(self, testcase_name, test_mode='Automated', test_steps=None, parameters=None,
+                          suite_run_id=None, checkpoint=None):
+        """Execute test case by reading from database
+
+        Pre-read test_steps can be passed to avoid re-reading the table, and a
+        parameters row resolves ${name} placeholders in step values. Progress is
+        checkpointed every checkpoint_interval steps; pass a loaded checkpoint
+        to continue an interrupted run instead of starting from step 1.
+        """
         start_time = datetime.now()
+        preloaded_steps = test_steps
         test_steps = []
         passed_steps = 0
         failed_steps = 0
         step_results = []
         error_message = ""
+        self.run_id = checkpoint['run_id'] if checkpoint else uuid.uuid4().hex
+        checkpointed = bool(checkpoint)
+        artifacts = get_artifact_capture(self.get_db_connection)
         
         try:
             print(f"🚀 Starting test execution for: {testcase_name}")
             
             # Read test steps from database
-            test_steps = self.read_test_steps_from_db(testcase_name)
+            test_steps = preloaded_steps or self.read_test_steps_from_db(testcase_name)
             
             if not test_steps:
                 raise RuntimeError("No test steps found in database")
             
+            if parameters:
+                test_steps = self.apply_parameters(test_steps, parameters)
+            
             print(f"📖 Found {len(test_steps)} test steps")
             
+            snapshot_plan = None
+            start_index = 0
+            if checkpoint:
+                # Continue after the last good checkpoint
+                if self.resume_from_checkpoint(checkpoint):
+                    start_index = checkpoint['next_index']
+                    passed_steps = checkpoint['passed_steps']
+                    failed_steps = checkpoint['failed_steps']
+                    step_results = list(checkpoint['step_results'])
+                    error_message = checkpoint['error_message']
+                    start_time -= timedelta(seconds=checkpoint['elapsed_seconds'])
+            else:
+                # Skip a shared setup prefix by restoring its session snapshot
+                snapshot_plan = self.snapshots.plan(test_steps)
+            
+            if snapshot_plan and snapshot_plan['state'] and self.restore_snapshot(snapshot_plan):
+                start_index = snapshot_plan['prefix_length']
+                passed_steps += start_index
+                step_results.extend(f"{step['step_no']}:RESTORED" for step in test_steps[:start_index])
+            
             # Execute each test step
-            for step in test_steps:
+            for index, step in enumerate(test_steps[start_index:], start_index):
                 step_start_time = datetime.now()
                 step_status = "FAIL"
                 step_error = ""
@@ -219,15 +357,43 @@ class TestExecutor:
                     print(f"✅ Step {step['step_no']} executed successfully")
                     
                 except Exception as e:
+                    if self.browser_session_lost(e):
+                        raise SessionLostError(f"Step {step['step_no']}: browser session lost: {str(e)}")
                     step_status = "FAIL"
                     step_error = str(e)
                     failed_steps += 1
                     error_message += f"Step {step['step_no']}: {str(e)}; "
                     print(f"❌ Step {step['step_no']} failed: {str(e)}")
+                    artifacts.capture_failure(self.driver, self.run_id, testcase_name, step['step_no'])
                 
                 step_results.append(f"{step['step_no']}:{step_status}")
+                if self.network_controller:
+                    # Drain the performance log each step so it never piles up in chromedriver
+                    self.network_controller.collect(self.driver)
+                
+                if (snapshot_plan and not start_index and failed_steps == 0
+                        and index == snapshot_plan['prefix_length'] - 1):
+                    self.capture_snapshot(snapshot_plan)
+                
+                if self.checkpoint_interval and (index + 1) % self.checkpoint_interval == 0 and index + 1 < len(test_steps):
+                    checkpointed = self.save_checkpoint({
+                        'run_id': self.run_id,
+                        'suite_run_id': suite_run_id,
+                        'testcase_name': testcase_name,
+                        'test_mode': test_mode,
+                        'parameters': parameters,
+                        'next_index': index + 1,
+                        'passed_steps': passed_steps,
+                        'failed_steps': failed_steps,
+                        'step_results': step_results,
+                        'error_message': error_message,
+                        'elapsed_seconds': (datetime.now() - start_time).total_seconds()
+                    }) or checkpointed
                 time.sleep(0.5)
             
+            resource_usage = self.stop_session_monitor()
+            network_usage = self.stop_network_control()
+            
             # Calculate execution time
             end_time = datetime.now()
             execution_time = str(end_time - start_time)
@@ -239,19 +405,22 @@ class TestExecutor:
             result_data = {
                 'testcase_name': testcase_name,
                 'tc_id': test_steps[0]['tc_id'] if test_steps else 'N/A',
-                'test_mode': 'Automated',
+                'test_mode': test_mode,
                 'status': overall_status,
                 'total_steps': len(test_steps),
                 'passed_steps': passed_steps,
                 'failed_steps': failed_steps,
                 'execution_time': execution_time,
-                'test_data': 'Automated Test Data',
+                'test_data': json.dumps(parameters) if parameters else 'Automated Test Data',
                 'step_results': ','.join(step_results),
                 'error_message': error_message.strip()
             }
             
             # Write results to database
-            self.write_result_to_db(testcase_name, result_data)
+            result_id = self.write_result_to_db(testcase_name, result_data)
+            artifacts.link_result(self.run_id, result_id)
+            if checkpointed:
+                self.checkpoints.mark(self.run_id, 'completed')
             
             print(f"\n🎉 Test execution completed!")
             print(f"Status: {overall_status}")
@@ -259,17 +428,39 @@ class TestExecutor:
             print(f"Passed: {passed_steps}")
             print(f"Failed: {failed_steps}")
             print(f"Execution Time: {execution_time}")
+            print(f"Click paths: {self.click_stats}")
             
             return {
                 'success': True,
+                'run_id': self.run_id,
+                'result_id': result_id,
                 'status': overall_status,
                 'total_steps': len(test_steps),
                 'passed_steps': passed_steps,
                 'failed_steps': failed_steps,
                 'execution_time': execution_time,
+                'error_message': error_message.strip(),
+                'resource_usage': resource_usage,
+                'network_usage': network_usage,
+                'click_paths': dict(self.click_stats),
                 'message': f'Test execution completed. Results saved to {testcase_name}_Results table'
             }
             
+        except SessionLostError as e:
+            # No result row and no 'completed' mark: the checkpoint stays 'running'
+            # so a retry or resume_test_case continues from the last saved step
+            print(f"💥 {str(e)}; run {self.run_id} left resumable" if checkpointed else f"💥 {str(e)}")
+            return {
+                'success': False,
+                'session_lost': True,
+                'resumable': checkpointed,
+                'run_id': self.run_id,
+                'error': str(e),
+                'total_steps': len(test_steps),
+                'passed_steps': passed_steps,
+                'failed_steps': failed_steps
+            }
+
         except Exception as e:
             error_msg = f"Critical error during test execution: {str(e)}"
             print(f"💥 {error_msg}")
@@ -330,36 +521,44 @@ class TestExecutor:
 
     def perform_robust_click(self, element):
         """Enhanced click with fallback strategies"""
-        for attempt in range(1, 4):
+        skipped = None
+        try:
+            skipped = self.driver.execute_script(SCRIPTED_CLICK_JS, element)
+            if not skipped:
+                self.click_stats['scripted'] += 1
+                return
+            print(f"Scripted click skipped ({skipped}), falling back")
+        except Exception as e:
+            print(f"Scripted click failed ({str(e)}), falling back")
+
+        if skipped and skipped.startswith('covered'):
+            # A pointer click at the element's position would land on the overlay
+            # (and ActionChains would report it as a success), so dispatch the click
+            # to the element itself or fail
             try:
-                self.scroll_to_element(element)
-                time.sleep(0.2)
-                
-                if attempt == 1:
-                    element.click()
-                elif attempt == 2:
-                    self.driver.execute_script("arguments[0].click();", element)
-                elif attempt == 3:
-                    self.actions.move_to_element(element).click().perform()
-                
-                print(f"✓ Click successful on attempt {attempt}")
+                self.driver.execute_script("arguments[0].click();", element)
+                self.click_stats['js_forced'] += 1
+                print(f"✓ Click dispatched via JavaScript past overlay ({skipped})")
                 return
-                
             except Exception as e:
-                if attempt == 3:
-                    raise RuntimeError(f"All click attempts failed: {str(e)}")
-                time.sleep(0.3)
+                self.click_stats['failed'] += 1
+                raise RuntimeError(f"Element is {skipped} and the JavaScript click failed: {str(e)}")
 
-    def scroll_to_element(self, element):
-        """Scroll to element"""
         try:
-            self.driver.execute_script(
-                "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", 
-                element
-            )
-            time.sleep(0.3)
+            element.click()
+            self.click_stats['native'] += 1
+            print("✓ Click successful via native click")
+            return
         except Exception:
-            print("Could not scroll to element")
+            time.sleep(0.3)
+
+        try:
+            self.actions.move_to_element(element).click().perform()
+            self.click_stats['action_chains'] += 1
+            print("✓ Click successful via ActionChains")
+        except Exception as e:
+            self.click_stats['failed'] += 1
+            raise RuntimeError(f"All click attempts failed: {str(e)}")
 
     def perform_robust_text_input(self, element, text):
         """Enhanced text input for SPAs"""
@@ -404,14 +603,119 @@ class TestExecutor:
             print(f"💾 Data: {values}")
         print("=" * 60)
 
+    def browser_session_lost(self, error):
+        """Tell a crashed or closed browser apart from an ordinary step failure.
+
+        Step errors are wrapped and carry page data, so apart from an explicit
+        InvalidSessionIdException the session is probed directly and the
+        probe's error decides.
+        """
+        if not self.driver:
+            return False
+        if isinstance(error, InvalidSessionIdException):
+            return True
+        try:
+            self.driver.current_window_handle
+            return False
+        except Exception as probe_error:
+            return is_session_lost_error(probe_error)
+
+    def resume_test_case(self, run_id):
+        """Resume an interrupted run from its last checkpoint"""
+        checkpoint = self.checkpoints.load(run_id)
+        if not checkpoint:
+            raise RuntimeError(f"No checkpoint found for run {run_id}")
+        if checkpoint['status'] != 'running':
+            raise RuntimeError(f"Run {run_id} is already {checkpoint['status']}")
+
+        print(f"♻️ Resuming {checkpoint['testcase_name']} at step index {checkpoint['next_index']}")
+        return self.execute_test_case(
+            checkpoint['testcase_name'],
+            test_mode=checkpoint['test_mode'],
+            parameters=checkpoint['parameters'],
+            suite_run_id=checkpoint['suite_run_id'],
+            checkpoint=checkpoint
+        )
+
+    def save_checkpoint(self, checkpoint):
+        """Record completed steps, partial results and the browser session state"""
+        try:
+            checkpoint['session_state'] = capture_browser_state(self.driver) if self.driver else None
+            self.checkpoints.save(checkpoint)
+            print(f"💾 Checkpoint saved after {checkpoint['next_index']} steps")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not save checkpoint: {str(e)}")
+            return False
+
+    def resume_from_checkpoint(self, checkpoint):
+        """Bring the browser back to a checkpoint's state; False means start over"""
+        if not checkpoint['session_state']:
+            print("⚠️ Checkpoint has no browser state, restarting from step 1")
+            return False
+        try:
+            self.launch_browser()
+            restore_browser_state(self.driver, checkpoint['session_state'])
+            self.wait_for_spa_ready()
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not restore checkpoint state, restarting from step 1: {str(e)}")
+            self.close_browser()
+            return False
+
+    def restore_snapshot(self, snapshot_plan):
+        """Launch the browser in a captured setup state instead of replaying its steps"""
+        try:
+            self.launch_browser()
+            restore_browser_state(self.driver, snapshot_plan['state'])
+            self.wait_for_spa_ready()
+            print(f"⏩ Restored session snapshot '{snapshot_plan['snapshot_name']}', "
+                  f"skipped {snapshot_plan['prefix_length']} setup steps")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not restore session snapshot, replaying setup steps: {str(e)}")
+            self.close_browser()
+            return False
+
+    def capture_snapshot(self, snapshot_plan):
+        """Capture the browser state reached after a setup prefix"""
+        try:
+            state = capture_browser_state(self.driver)
+            self.snapshots.save(snapshot_plan['snapshot_name'], snapshot_plan['fingerprint'], state)
+        except Exception as e:
+            print(f"⚠️ Could not capture session snapshot: {str(e)}")
+
+    def stop_session_monitor(self):
+        """Stop resource sampling for the current browser session"""
+        if not self.session_monitor:
+            return None
+        usage = self.session_monitor.stop()
+        self.session_monitor = None
+        print(f"📈 Session usage: peak RSS {usage['peak_rss_mb']}MB, avg CPU {usage['avg_cpu_percent']}%")
+        return usage
+
+    def stop_network_control(self):
+        """Stop the session proxy and report blocked/cached traffic"""
+        if not self.network_controller:
+            return None
+        usage = self.network_controller.stop(self.driver)
+        self.network_controller = None
+        print(f"🌐 Network: {usage['blocked']} blocked, {usage['cache_hits']} cache hits, "
+              f"{usage['bytes_saved']} bytes served from cache")
+        return usage
+
     def close_browser(self):
         """Close browser"""
+        self.stop_session_monitor()
+        self.stop_network_control()
         try:
             if self.driver:
                 self.driver.quit()
                 print("✓ Browser closed successfully")
         except Exception as e:
             print(f"✗ Error closing browser: {str(e)}")
+        finally:
+            self.driver = None
 
     def execute_action(self, action_type, test_data, xpath, element_name):
         """Execute specific action based on action type"""
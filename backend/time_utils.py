@@ -0,0 +1,14 @@
+import re
+
+
+def parse_execution_time(value):
+    """Parse an execution_time string written as str(timedelta) into seconds"""
+    if not value:
+        return None
+
+    match = re.match(r'^(?:(\d+) days?, )?(\d+):(\d{1,2}):(\d{1,2}(?:\.\d+)?)$', value.strip())
+    if not match:
+        return None
+
+    days, hours, minutes, seconds = match.groups()
+    return int(days or 0) * 86400 + int(hours) * 3600 + int(minutes) * 60 + float(seconds)
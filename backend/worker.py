@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Standalone test execution worker.
+
+Pulls test case runs from the shared TestJobs table and executes them with
+TestExecutor. Start one per machine (or several per machine) to run a suite
+in parallel; jobs held by a crashed worker are reclaimed once its lease expires.
+
+Local example with a SQLite stand-in for SQL Server:
+    python worker.py --sqlite jobs.db --enqueue Flight_Search Hotel_Search Bus_Search
+    python worker.py --sqlite jobs.db --simulate 3 --exit-when-idle &
+    python worker.py --sqlite jobs.db --simulate 3 --exit-when-idle &
+"""
+
+import argparse
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+from job_queue import JobQueue
+
+
+class SimulatedExecutor:
+    """Stand-in executor for exercising the queue without a browser or SQL Server"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def execute_test_case(self, testcase_name):
+        time.sleep(self.seconds)
+        return {
+            'success': True,
+            'status': 'PASS',
+            'total_steps': 0,
+            'passed_steps': 0,
+            'failed_steps': 0,
+            'execution_time': str(self.seconds)
+        }
+
+
+class Worker:
+    """Lease jobs, keep the lease alive while executing, and report results"""
+
+    def __init__(self, job_queue, executor_factory, worker_id=None, poll_interval=2.0, heartbeat_interval=None):
+        self.job_queue = job_queue
+        self.executor_factory = executor_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or max(job_queue.lease_seconds / 3, 1)
+        self.stopped = threading.Event()
+
+    def run(self, exit_when_idle=False):
+        print(f"👷 Worker {self.worker_id} started")
+        while not self.stopped.is_set():
+            job = self.job_queue.lease(self.worker_id)
+            if not job:
+                if exit_when_idle:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self.process(job)
+        print(f"👋 Worker {self.worker_id} stopped")
+
+    def process(self, job):
+        print(f"🚀 Worker {self.worker_id} leased job {job['job_id']}: {job['testcase_name']} (attempt {job['attempts']})")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job['job_id'], done), daemon=True)
+        heartbeat.start()
+
+        try:
+            result = self.executor_factory().execute_test_case(job['testcase_name'])
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if self.job_queue.complete(job['job_id'], self.worker_id, result):
+            print(f"✅ Job {job['job_id']} finished: {result.get('status', result.get('error'))}")
+        else:
+            print(f"⚠️ Job {job['job_id']} was reclaimed by another worker; result discarded")
+
+    def _heartbeat(self, job_id, done):
+        while not done.wait(self.heartbeat_interval):
+            try:
+                if not self.job_queue.heartbeat(job_id, self.worker_id):
+                    print(f"⚠️ Lost lease on job {job_id}")
+                    return
+            except Exception as e:
+                print(f"✗ Heartbeat failed for job {job_id}: {str(e)}")
+
+
+def build_queue(args):
+    """Create the job queue against SQL Server or a local SQLite file"""
+    if args.sqlite:
+        def connection_factory():
+            return sqlite3.connect(args.sqlite, timeout=30)
+        job_queue = JobQueue(connection_factory, 'sqlite', lease_seconds=args.lease_seconds)
+    else:
+        from test_executor import TestExecutor
+        job_queue = JobQueue(TestExecutor().get_db_connection, 'mssql', lease_seconds=args.lease_seconds)
+
+    job_queue.ensure_table()
+    return job_queue
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Selenium test execution worker")
+    parser.add_argument('--sqlite', help="Use a local SQLite file instead of SQL Server")
+    parser.add_argument('--worker-id', help="Worker name (default: host-pid)")
+    parser.add_argument('--lease-seconds', type=float, default=120)
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    parser.add_argument('--exit-when-idle', action='store_true', help="Stop when the queue is empty")
+    parser.add_argument('--simulate', type=float, metavar='SECONDS',
+                        help="Sleep instead of launching a browser (local queue testing)")
+    parser.add_argument('--browser-profile', help="Browser profile for executions (default, lean, headless)")
+    parser.add_argument('--enqueue', nargs='+', metavar='TESTCASE', help="Queue test cases and exit")
+    parser.add_argument('--status', action='store_true', help="Print job counts and exit")
+    args = parser.parse_args(argv)
+
+    job_queue = build_queue(args)
+
+    if args.enqueue:
+        for testcase_name in args.enqueue:
+            print(f"📥 Queued job {job_queue.enqueue(testcase_name)}: {testcase_name}")
+        return 0
+
+    if args.status:
+        print(job_queue.counts())
+        return 0
+
+    if args.simulate is not None:
+        def executor_factory():
+            return SimulatedExecutor(args.simulate)
+    else:
+        from test_executor import TestExecutor
+
+        def executor_factory():
+            return TestExecutor(browser_profile=args.browser_profile)
+
+    worker = Worker(job_queue, executor_factory, args.worker_id, args.poll_interval)
+    try:
+        worker.run(exit_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        worker.stopped.set()
+    finally:
+        if args.simulate is None:
+            from artifact_store import flush_artifacts
+            flush_artifacts(timeout=60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())